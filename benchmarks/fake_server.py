@@ -0,0 +1,105 @@
+"""In-process stand-in for the Dawarich API used by the benchmarks."""
+
+import asyncio
+import random
+from collections import Counter
+
+from aiohttp import web
+
+API_KEY = "benchmark"
+
+
+class FakeDawarichServer:
+    """Serve the stats and Overland batch endpoints of Dawarich.
+
+    Every request waits ``latency`` seconds, then fails with a 500 with
+    probability ``error_rate`` or a 401 with probability ``unauthorized_rate``.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        unauthorized_rate: float = 0.0,
+        years: int = 5,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.unauthorized_rate = unauthorized_rate
+        self.years = years
+        self.points_received = 0
+        self.responses: Counter[int] = Counter()
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def start(self) -> str:
+        """Start listening on a free local port and return the base url."""
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_get("/api/v1/stats", self._handle_stats)
+        app.router.add_post("/api/v1/overland/batches", self._handle_batches)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _fault(self, request: web.Request) -> web.Response | None:
+        """Apply the configured latency and return an injected error, if any."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.headers.get("Authorization") != f"Bearer {API_KEY}":
+            return web.Response(status=401)
+        roll = self._random.random()
+        if roll < self.error_rate:
+            return web.Response(status=500)
+        if roll < self.error_rate + self.unauthorized_rate:
+            return web.Response(status=401)
+        return None
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        etag = f'"{self.points_received}"'
+        response = await self._fault(request)
+        if response is None and request.headers.get("If-None-Match") == etag:
+            response = web.Response(status=304)
+        elif response is None:
+            response = web.json_response(
+                {
+                    "totalDistanceKm": self.points_received / 100,
+                    "totalPointsTracked": self.points_received,
+                    "totalReverseGeocodedPoints": 0,
+                    "totalCountriesVisited": 1,
+                    "totalCitiesVisited": 1,
+                    "yearlyStats": [
+                        {
+                            "year": 2000 + year,
+                            "totalDistanceKm": year,
+                            "totalCountriesVisited": 1,
+                            "totalCitiesVisited": 1,
+                            "monthlyDistanceKm": {"january": year},
+                        }
+                        for year in range(self.years)
+                    ],
+                },
+                headers={"ETag": etag},
+            )
+        self.responses[response.status] += 1
+        return response
+
+    async def _handle_batches(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if (response := await self._fault(request)) is None:
+            self.points_received += len(body["locations"])
+            response = web.json_response({}, status=201)
+        self.responses[response.status] += 1
+        return response
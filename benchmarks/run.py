@@ -0,0 +1,369 @@
+"""Benchmarks of the Dawarich tracker and coordinator hot paths.
+
+Run from the repository root, with Home Assistant installed:
+
+    python -m benchmarks.run --output benchmark.json
+
+Every scenario runs against an in-process fake Dawarich server, and the
+results are written as JSON so they can be compared between releases.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Sequence
+from datetime import timedelta
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import aiohttp
+from dawarich_api.api_calls import AddOnePointResponse
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.api import (
+    DawarichClient,
+    DawarichConnectionPool,
+    DawarichPoint,
+)
+from custom_components.dawarich.buffer import DawarichFixBuffer
+from custom_components.dawarich.const import MAX_CONNECTIONS_PER_HOST
+from custom_components.dawarich.coordinator import DawarichCoordinator
+from custom_components.dawarich.outbox import DawarichOutbox
+from custom_components.dawarich.pipeline import DawarichPointPipeline
+from custom_components.dawarich.tracker import DawarichTracker
+from custom_components.dawarich.uploader import DawarichUploader
+
+from .fake_server import API_KEY, FakeDawarichServer
+
+MANIFEST = (
+    Path(__file__).parents[1] / "custom_components" / "dawarich" / "manifest.json"
+)
+
+# Give up waiting for a scenario to deliver all of its points after this long.
+DRAIN_TIMEOUT = 120
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a periodic task."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        """Start sampling."""
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(loop.time() - start - self.interval)
+
+
+def summarize(samples: list[float]) -> dict[str, float | None]:
+    """Return the p50, p99 and maximum of samples in seconds, as milliseconds."""
+    if not samples:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "p50_ms": percentile(0.5),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def time_uploads(client: DawarichClient, samples: list[float]) -> None:
+    """Record the duration of every batch upload made by the client."""
+    add_points = client.add_points
+
+    async def timed_add_points(points: Sequence[DawarichPoint]) -> AddOnePointResponse:
+        start = time.perf_counter()
+        try:
+            return await add_points(points)
+        finally:
+            samples.append(time.perf_counter() - start)
+
+    client.add_points = timed_add_points  # type: ignore[method-assign]
+
+
+async def bench_tracker_burst(
+    hass: HomeAssistant,
+    session: aiohttp.ClientSession,
+    storage: Path,
+    *,
+    trackers: int,
+    fixes: int,
+    latency: float,
+    error_rate: float = 0.0,
+    unauthorized_rate: float = 0.0,
+) -> dict[str, Any]:
+    """Fire bursts of state changes for several trackers and wait for delivery."""
+    server = FakeDawarichServer(
+        latency=latency, error_rate=error_rate, unauthorized_rate=unauthorized_rate
+    )
+    url = await server.start()
+    client = DawarichClient(
+        url, API_KEY, DawarichConnectionPool(session, MAX_CONNECTIONS_PER_HOST)
+    )
+    upload_latencies: list[float] = []
+    time_uploads(client, upload_latencies)
+    uploader = DawarichUploader(
+        hass,
+        client,
+        DawarichOutbox(storage / f"outbox_{trackers}_{error_rate}.db"),
+        flush_interval=timedelta(milliseconds=100),
+        retry_interval=timedelta(milliseconds=100),
+    )
+    await uploader.async_setup()
+    entity_ids = [f"device_tracker.bench_{index}" for index in range(trackers)]
+    tracker = DawarichTracker(
+        hass, uploader, {entity_id: entity_id for entity_id in entity_ids}, {}
+    )
+    tracker.async_start()
+
+    expected = trackers * fixes
+    async with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        for fix in range(fixes):
+            for index, entity_id in enumerate(entity_ids):
+                hass.states.async_set(
+                    entity_id,
+                    "not_home",
+                    {
+                        "latitude": 52 + fix * 1e-4,
+                        "longitude": 4 + index * 1e-3,
+                        "gps_accuracy": 5,
+                        "speed": 1.5,
+                    },
+                )
+            await asyncio.sleep(0)
+        dispatch_time = time.perf_counter() - start
+        while (
+            server.points_received < expected
+            and time.perf_counter() - start < DRAIN_TIMEOUT
+        ):
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+    tracker.async_stop()
+    await uploader.async_shutdown()
+    await server.stop()
+    return {
+        "scenario": "tracker_burst",
+        "trackers": trackers,
+        "fixes_per_tracker": fixes,
+        "server_latency_ms": latency * 1000,
+        "error_rate": error_rate,
+        "unauthorized_rate": unauthorized_rate,
+        "points_expected": expected,
+        "points_delivered": server.points_received,
+        "dispatch_seconds": dispatch_time,
+        "elapsed_seconds": elapsed,
+        "points_per_second": server.points_received / elapsed,
+        "requests": len(upload_latencies),
+        "responses": {str(status): count for status, count in server.responses.items()},
+        "upload_latency": summarize(upload_latencies),
+        "event_loop_lag": summarize(monitor.samples),
+    }
+
+
+async def bench_coordinator_refresh(
+    hass: HomeAssistant,
+    session: aiohttp.ClientSession,
+    *,
+    refreshes: int,
+    years: int,
+    latency: float,
+) -> dict[str, Any]:
+    """Measure the cost of a stats refresh."""
+    server = FakeDawarichServer(latency=latency, years=years)
+    url = await server.start()
+    client = DawarichClient(
+        url, API_KEY, DawarichConnectionPool(session, MAX_CONNECTIONS_PER_HOST)
+    )
+    coordinator = DawarichCoordinator(hass, client, conditional=True)
+    samples = []
+    async with LoopLagMonitor() as monitor:
+        for _ in range(refreshes):
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            samples.append(time.perf_counter() - start)
+    await server.stop()
+    return {
+        "scenario": "coordinator_refresh",
+        "refreshes": refreshes,
+        "years": years,
+        "server_latency_ms": latency * 1000,
+        "last_update_success": coordinator.last_update_success,
+        "refresh": summarize(samples),
+        "event_loop_lag": summarize(monitor.samples),
+    }
+
+
+BENCH_STATE = State(
+    "device_tracker.bench",
+    "not_home",
+    {
+        "latitude": 52.0,
+        "longitude": 4.0,
+        "gps_accuracy": 5,
+        "altitude": 10.0,
+        "vertical_accuracy": 3,
+        "speed": 1.5,
+        "course": 90.0,
+        "battery_level": 80,
+    },
+)
+
+
+def bench_memory_per_point(count: int) -> dict[str, Any]:
+    """Measure the memory held by each point, as a dict, object and buffer row."""
+    pipeline = DawarichPointPipeline()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    attributes = [dict(BENCH_STATE.attributes) for _ in range(count)]
+    after_dicts = tracemalloc.get_traced_memory()[0]
+    points = [pipeline("bench", BENCH_STATE, dt_util.utcnow()) for _ in range(count)]
+    after_points = tracemalloc.get_traced_memory()[0]
+    fixes = DawarichFixBuffer(count)
+    for point in points:
+        fixes.append(point)
+    after_buffer = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "scenario": "memory_per_point",
+        "points": len(points),
+        "dict_bytes_per_point": (after_dicts - before) / len(attributes),
+        "bytes_per_point": (after_points - after_dicts) / count,
+        "buffer_bytes_per_point": (after_buffer - after_points) / len(fixes),
+    }
+
+
+def bench_pipeline(count: int) -> dict[str, Any]:
+    """Measure the cost of turning a state into a point."""
+    timestamp = dt_util.utcnow()
+    pipelines = {
+        "default": DawarichPointPipeline(),
+        "renamed": DawarichPointPipeline({"speed": "velocity", "course": "heading"}),
+        "converted": DawarichPointPipeline(
+            units={"speed": "km/h", "altitude": "ft", "horizontal_accuracy": "ft"}
+        ),
+    }
+    results = {}
+    for name, pipeline in pipelines.items():
+        start = time.perf_counter()
+        for _ in range(count):
+            pipeline("bench", BENCH_STATE, timestamp)
+        results[f"{name}_ns_per_point"] = (time.perf_counter() - start) / count * 1e9
+    return {"scenario": "pipeline", "points": count, **results}
+
+
+async def async_main(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario and return the results."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            async with aiohttp.ClientSession() as session:
+                scenarios = [
+                    await bench_tracker_burst(
+                        hass,
+                        session,
+                        Path(config_dir),
+                        trackers=trackers,
+                        fixes=args.fixes,
+                        latency=args.latency,
+                    )
+                    for trackers in args.trackers
+                ]
+                scenarios.append(
+                    await bench_tracker_burst(
+                        hass,
+                        session,
+                        Path(config_dir),
+                        trackers=max(args.trackers),
+                        fixes=args.fixes,
+                        latency=args.latency,
+                        error_rate=args.error_rate,
+                        unauthorized_rate=args.unauthorized_rate,
+                    )
+                )
+                scenarios.append(
+                    await bench_coordinator_refresh(
+                        hass,
+                        session,
+                        refreshes=args.refreshes,
+                        years=args.years,
+                        latency=args.latency,
+                    )
+                )
+            await hass.async_block_till_done()
+        finally:
+            await hass.async_stop(force=True)
+    scenarios.append(bench_memory_per_point(args.memory_points))
+    scenarios.append(bench_pipeline(args.pipeline_points))
+
+    return {
+        "integration_version": json.loads(MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "started": dt_util.utcnow().isoformat(),
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmarks and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--trackers",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=[1, 5, 10, 25, 50],
+        help="comma separated numbers of simulated trackers",
+    )
+    parser.add_argument("--fixes", type=int, default=100, help="fixes per tracker")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="server latency in seconds"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--unauthorized-rate", type=float, default=0.02)
+    parser.add_argument("--refreshes", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--memory-points", type=int, default=10_000)
+    parser.add_argument("--pipeline-points", type=int, default=100_000)
+    parser.add_argument("--output", type=Path, help="write the JSON results here")
+    args = parser.parse_args()
+
+    results = json.dumps(asyncio.run(async_main(args)), indent=2)
+    if args.output is None:
+        sys.stdout.write(results + "\n")
+    else:
+        args.output.write_text(results + "\n")
+
+
+if __name__ == "__main__":
+    main()
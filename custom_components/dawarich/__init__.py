@@ -1,9 +1,13 @@
 """The Dawarich integration."""
 
+import asyncio
 import logging
-from dataclasses import dataclass
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from dawarich_api import DawarichAPI
 from homeassistant import config_entries
 from homeassistant.const import (
     CONF_API_KEY,
@@ -14,16 +18,72 @@ from homeassistant.const import (
     CONF_VERIFY_SSL,
     Platform,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import CONF_DEVICE, DOMAIN
+from .api import DawarichClient, DawarichPoint
+from .const import (
+    CONF_BATCH_SIZE,
+    CONF_CACHE_TTL,
+    CONF_CONDITIONAL_REQUESTS,
+    CONF_DEVICE,
+    CONF_DEVICES,
+    CONF_FAST_START,
+    CONF_FLUSH_INTERVAL,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_ACCURACY,
+    CONF_MAX_CONNECTIONS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIRRORS,
+    CONF_POLL_INTERVAL,
+    CONF_PUSH_MODE,
+    DEFAULT_CONDITIONAL_REQUESTS,
+    DEFAULT_FAST_START,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_PUSH_MODE,
+    DOMAIN,
+    MAX_UPDATE_INTERVAL,
+    PUSH_SAFETY_INTERVAL,
+    STATS_CACHE_TTL,
+    UPDATE_INTERVAL,
+    UPLOAD_BATCH_SIZE,
+    UPLOAD_FLUSH_INTERVAL,
+)
 from .coordinator import DawarichCoordinator
-from .helpers import get_api
+from .helpers import get_api, get_tracked_devices
+from .outbox import DawarichOutbox
+from .services import async_setup_services
+from .tracker import DawarichTracker
+from .uploader import DawarichUploader
+
+if TYPE_CHECKING:
+    from dawarich_api.api_calls import AddOnePointResponse
+
+    from .statistics import DawarichStatisticsImporter
 
 VERSION = "0.3.2"
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+STATS_STORAGE_VERSION = 1
+
+# Options that are applied to a running entry without reloading it.
+LIVE_OPTIONS = frozenset(
+    {
+        CONF_POLL_INTERVAL,
+        CONF_MAX_POLL_INTERVAL,
+        CONF_BATCH_SIZE,
+        CONF_FLUSH_INTERVAL,
+        CONF_MAX_ACCURACY,
+        CONF_MAX_CONNECTIONS,
+    }
+)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 _LOGGER = logging.getLogger(__name__)
 
 type DawarichConfigEntry = config_entries.ConfigEntry[DawarichConfigEntryData]
@@ -33,8 +93,20 @@ type DawarichConfigEntry = config_entries.ConfigEntry[DawarichConfigEntryData]
 class DawarichConfigEntryData:
     """Runtime data definitions."""
 
-    api: DawarichAPI
+    api: DawarichClient
     coordinator: DawarichCoordinator
+    uploader: DawarichUploader
+    tracker: DawarichTracker
+    mirrors: dict[str, DawarichUploader] = field(default_factory=dict)
+    options: dict[str, Any] = field(default_factory=dict)
+    backfill_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    statistics: "DawarichStatisticsImporter | None" = None
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Dawarich services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) -> bool:
@@ -45,34 +117,264 @@ async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) ->
     host = entry.data[CONF_HOST]
     api_key = entry.data[CONF_API_KEY]
     use_ssl = entry.data[CONF_SSL]
+    verify_ssl = entry.data[CONF_VERIFY_SSL]
+
+    api = get_api(hass, host, api_key, use_ssl, verify_ssl)
+
+    push = entry.options.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE)
+    if push:
+        # Uploads trigger the refreshes, polling is only a safety net.
+        min_interval = max_interval = PUSH_SAFETY_INTERVAL
+    else:
+        min_interval, max_interval = _poll_intervals(entry.options)
+
+    coordinator = DawarichCoordinator(
+        hass,
+        api,
+        min_interval=min_interval,
+        max_interval=max_interval,
+        store=_stats_store(hass, entry),
+        cache_ttl=timedelta(
+            seconds=entry.options.get(CONF_CACHE_TTL, STATS_CACHE_TTL.total_seconds())
+        ),
+        conditional=entry.options.get(
+            CONF_CONDITIONAL_REQUESTS, DEFAULT_CONDITIONAL_REQUESTS
+        ),
+        push=push,
+    )
+    if (
+        entry.options.get(CONF_FAST_START, DEFAULT_FAST_START)
+        and await coordinator.async_restore()
+    ):
+        # Start from the last known stats and refresh them in the background,
+        # so a slow or unreachable server does not hold up the setup.
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_refresh(),
+            f"dawarich first refresh {entry.entry_id}",
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
-    api = get_api(host, api_key, use_ssl)
+    uploader = DawarichUploader(hass, api, DawarichOutbox(_outbox_path(hass, entry)))
+    await uploader.async_setup()
 
-    coordinator = DawarichCoordinator(hass, api)
-    await coordinator.async_config_entry_first_refresh()
+    # Drop the outboxes of mirrors that were removed from the options.
+    await hass.async_add_executor_job(
+        _remove_outboxes, hass, entry, (None, *entry.options.get(CONF_MIRRORS, []))
+    )
+    mirrors = {}
+    for target_id in entry.options.get(CONF_MIRRORS, []):
+        target = hass.config_entries.async_get_entry(target_id)
+        if target is None or target.domain != DOMAIN or target_id == entry.entry_id:
+            _LOGGER.warning("Ignoring unknown Dawarich mirror %s", target_id)
+            continue
+        mirror = DawarichUploader(
+            hass,
+            get_api(
+                hass,
+                target.data[CONF_HOST],
+                target.data[CONF_API_KEY],
+                target.data[CONF_SSL],
+                target.data[CONF_VERIFY_SSL],
+            ),
+            DawarichOutbox(_outbox_path(hass, entry, target_id)),
+        )
+        await mirror.async_setup()
+        mirrors[target_id] = mirror
+
+    tracker = DawarichTracker(
+        hass,
+        uploader,
+        get_tracked_devices(entry.data[CONF_NAME], entry.data[CONF_DEVICES]),
+        entry.options,
+        mirrors,
+    )
+    tracker.async_start()
+
+    @callback
+    def _async_points_uploaded(
+        points: Sequence[DawarichPoint], response: "AddOnePointResponse"
+    ) -> None:
+        if response.success:
+            coordinator.async_points_uploaded(refresh=push)
+
+    entry.async_on_unload(uploader.async_add_listener(_async_points_uploaded))
 
-    entry.runtime_data = DawarichConfigEntryData(api=api, coordinator=coordinator)
+    statistics = _async_setup_statistics(hass, entry, coordinator)
+
+    entry.runtime_data = DawarichConfigEntryData(
+        api=api,
+        coordinator=coordinator,
+        uploader=uploader,
+        tracker=tracker,
+        mirrors=mirrors,
+        options=dict(entry.options),
+        statistics=statistics,
+    )
+    _async_apply_options(entry)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
-async def async_unload_entry(
-    hass: HomeAssistant, entry: config_entries.ConfigEntry
-) -> bool:
+@callback
+def _async_setup_statistics(
+    hass: HomeAssistant, entry: DawarichConfigEntry, coordinator: DawarichCoordinator
+) -> "DawarichStatisticsImporter | None":
+    """Import the monthly distances into statistics whenever they change."""
+    if "recorder" not in hass.config.components or not entry.options.get(
+        CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+    ):
+        return None
+
+    # The recorder is only imported once statistics are imported.
+    from .statistics import DawarichStatisticsImporter  # noqa: PLC0415
+
+    importer = DawarichStatisticsImporter(hass, entry.entry_id, entry.data[CONF_NAME])
+
+    @callback
+    def _async_import_statistics() -> None:
+        entry.async_create_background_task(
+            hass,
+            importer.async_import(coordinator.periods),
+            f"dawarich statistics import {entry.entry_id}",
+        )
+
+    @callback
+    def _async_stats_updated() -> None:
+        if coordinator.changed_periods:
+            _async_import_statistics()
+
+    entry.async_on_unload(coordinator.async_add_listener(_async_stats_updated))
+    if coordinator.periods:
+        _async_import_statistics()
+    return importer
+
+
+def _poll_intervals(options: Mapping[str, Any]) -> tuple[timedelta, timedelta]:
+    """Return the shortest and longest polling interval of the options."""
+    return (
+        timedelta(
+            seconds=options.get(CONF_POLL_INTERVAL, UPDATE_INTERVAL.total_seconds())
+        ),
+        timedelta(
+            seconds=options.get(
+                CONF_MAX_POLL_INTERVAL, MAX_UPDATE_INTERVAL.total_seconds()
+            )
+        ),
+    )
+
+
+@callback
+def _async_apply_options(entry: DawarichConfigEntry) -> None:
+    """Apply the options that can change while the entry is running."""
+    runtime_data = entry.runtime_data
+    options = entry.options
+    for uploader in (runtime_data.uploader, *runtime_data.mirrors.values()):
+        uploader.batch_size = options.get(CONF_BATCH_SIZE, UPLOAD_BATCH_SIZE)
+        uploader.flush_interval = timedelta(
+            seconds=options.get(
+                CONF_FLUSH_INTERVAL, UPLOAD_FLUSH_INTERVAL.total_seconds()
+            )
+        )
+    runtime_data.tracker.async_update_options(options)
+    if CONF_MAX_CONNECTIONS in options:
+        # The pool is shared by every entry of the same server.
+        runtime_data.api.pool.set_limit(options[CONF_MAX_CONNECTIONS])
+
+
+async def _async_update_listener(
+    hass: HomeAssistant, entry: DawarichConfigEntry
+) -> None:
+    """Apply changed options live, or reload the entry if that is not possible."""
+    previous = entry.runtime_data.options
+    changed = {
+        key
+        for key in previous.keys() | entry.options.keys()
+        if previous.get(key) != entry.options.get(key)
+    }
+    if not changed:
+        return
+    if not changed <= LIVE_OPTIONS:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    entry.runtime_data.options = dict(entry.options)
+    _async_apply_options(entry)
+    if {CONF_POLL_INTERVAL, CONF_MAX_POLL_INTERVAL} & changed and not (
+        entry.options.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE)
+    ):
+        entry.runtime_data.coordinator.async_set_intervals(
+            *_poll_intervals(entry.options)
+        )
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: DawarichConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
+        entry.runtime_data.tracker.async_stop()
+        await entry.runtime_data.uploader.async_shutdown()
+        for mirror in entry.runtime_data.mirrors.values():
+            await mirror.async_shutdown()
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
 
 
-# Migration from 1 to 2
+async def async_remove_entry(
+    hass: HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Remove the outboxes, stats snapshot and statistics of a deleted config entry."""
+    await hass.async_add_executor_job(_remove_outboxes, hass, entry, ())
+    await _stats_store(hass, entry).async_remove()
+    if "recorder" in hass.config.components:
+        from .statistics import DawarichStatisticsImporter  # noqa: PLC0415
+
+        await DawarichStatisticsImporter(
+            hass, entry.entry_id, entry.data[CONF_NAME]
+        ).async_remove()
+
+
+def _outbox_path(
+    hass: HomeAssistant,
+    entry: config_entries.ConfigEntry,
+    target_id: str | None = None,
+) -> Path:
+    """Return the path of the outbox database of a config entry or its mirror."""
+    name = f"{DOMAIN}_outbox_{entry.entry_id}"
+    if target_id is not None:
+        name = f"{name}_{target_id}"
+    return Path(hass.config.path(STORAGE_DIR, f"{name}.db"))
+
+
+def _remove_outboxes(
+    hass: HomeAssistant,
+    entry: config_entries.ConfigEntry,
+    keep: Collection[str | None],
+) -> None:
+    """Delete the outboxes of a config entry and its mirrors, except ``keep``."""
+    keep_names = {_outbox_path(hass, entry, target_id).name for target_id in keep}
+    path = _outbox_path(hass, entry)
+    for pattern in (f"{path.name}*", f"{path.stem}_*.db*"):
+        for file in path.parent.glob(pattern):
+            if file.name.removesuffix("-wal").removesuffix("-shm") not in keep_names:
+                file.unlink(missing_ok=True)
+
+
+def _stats_store(
+    hass: HomeAssistant, entry: config_entries.ConfigEntry
+) -> Store[dict[str, Any]]:
+    """Return the store of the last stats snapshot of a config entry."""
+    return Store(hass, STATS_STORAGE_VERSION, f"{DOMAIN}.stats.{entry.entry_id}")
+
+
+# Migration from 1 to 3
 async def async_migrate_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry):
     """Migrate an old entry."""
-    if entry.version > 1:
+    if entry.version > 3:
         # Downgrade not supported
         return False
 
@@ -101,5 +403,27 @@ async def async_migrate_entry(hass: HomeAssistant, entry: config_entries.ConfigE
 
         hass.config_entries.async_update_entry(entry, data=data, version=2)
 
+    if entry.version == 2:
+        data = dict(entry.data)
+        device = data.pop(CONF_DEVICE, None)
+        data[CONF_DEVICES] = [device] if device else []
+
+        if device:
+            old_unique_id = f"{data[CONF_API_KEY]}/tracker"
+
+            @callback
+            def _migrate_tracker_unique_id(
+                entity_entry: er.RegistryEntry,
+            ) -> dict[str, str] | None:
+                if entity_entry.unique_id != old_unique_id:
+                    return None
+                return {"new_unique_id": f"{old_unique_id}/{device}"}
+
+            await er.async_migrate_entries(
+                hass, entry.entry_id, _migrate_tracker_unique_id
+            )
+
+        hass.config_entries.async_update_entry(entry, data=data, version=3)
+
     _LOGGER.info("Migrated %s to config flow version %s", entry.entry_id, entry.version)
     return True
@@ -0,0 +1,225 @@
+"""Dawarich API client used by the integration."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+import aiohttp
+from dawarich_api import DawarichAPI
+from dawarich_api.api_calls import (
+    API_V1_BATCHES_PATH,
+    API_V1_STATS_PATH,
+    AddOnePointResponse,
+    StatsResponse,
+    StatsResponseModel,
+)
+from homeassistant.helpers.json import json_bytes
+
+from .const import REQUEST_TIMEOUT
+from .metrics import DawarichClientMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Response headers that validate the stats, and the request headers to send
+# them back in.
+STATS_VALIDATORS = (("ETag", "If-None-Match"), ("Last-Modified", "If-Modified-Since"))
+
+
+@dataclass(slots=True)
+class DawarichPoint:
+    """A single location fix waiting to be uploaded to Dawarich.
+
+    Distances are in metres, the speed in m/s, the course in degrees and the
+    battery level in percent.
+    """
+
+    device_id: str
+    latitude: float
+    longitude: float
+    timestamp: datetime
+    altitude: float | None = None
+    speed: float | None = None
+    horizontal_accuracy: float | None = None
+    vertical_accuracy: float | None = None
+    battery_level: float | None = None
+    course: float | None = None
+    battery_state: str | None = None
+    zone: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the point as a JSON serializable dict."""
+        data = asdict(self)
+        data["timestamp"] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DawarichPoint":
+        """Restore a point from the output of as_dict."""
+        return cls(**{**data, "timestamp": datetime.fromisoformat(data["timestamp"])})
+
+    def as_feature(self, locations_in_payload: int) -> dict[str, Any]:
+        """Return the point as an Overland GeoJSON feature."""
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [self.longitude, self.latitude],
+            },
+            "properties": {
+                "timestamp": self.timestamp.isoformat(),
+                "altitude": self.altitude or 0,
+                "speed": self.speed or 0,
+                "horizontal_accuracy": self.horizontal_accuracy or 0,
+                "vertical_accuracy": self.vertical_accuracy or 0,
+                "locations_in_payload": locations_in_payload,
+                "device_id": self.device_id,
+                # Overland sends the battery level as a fraction.
+                "battery_level": (self.battery_level or 0) / 100,
+                "battery_state": self.battery_state or "unknown",
+                "course": -1 if self.course is None else self.course,
+                "zone": self.zone,
+            },
+        }
+
+
+class DawarichConnectionPool:
+    """Keep-alive connections to one Dawarich host, shared by every entry.
+
+    Requests go through Home Assistant's shared aiohttp session, which keeps
+    connections and TLS sessions alive, and at most ``limit`` of them are in
+    flight at once. The limit can be changed while requests are running.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, limit: int) -> None:
+        """Initialize the pool."""
+        self.session = session
+        self.limit = limit
+        self._active = 0
+        self._released = asyncio.Event()
+
+    def set_limit(self, limit: int) -> None:
+        """Change the number of requests allowed in flight at once."""
+        self.limit = limit
+        self._released.set()
+
+    @asynccontextmanager
+    async def request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Perform a request once a connection slot is free."""
+        while self._active >= self.limit:
+            self._released.clear()
+            await self._released.wait()
+        self._active += 1
+        try:
+            async with self.session.request(
+                method,
+                url,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                **kwargs,
+            ) as response:
+                yield response
+        finally:
+            self._active -= 1
+            self._released.set()
+
+
+class DawarichClient(DawarichAPI):
+    """Dawarich API client that sends its requests through a connection pool.
+
+    The status, latency and size of every request are recorded in ``metrics``.
+    The validators of the last stats response are kept in ``stats_validators``
+    as conditional request headers.
+    """
+
+    def __init__(self, url: str, api_key: str, pool: DawarichConnectionPool):
+        """Initialize the client."""
+        super().__init__(url=url, api_key=api_key)
+        self.pool = pool
+        self.metrics = DawarichClientMetrics()
+        self.stats_validators: dict[str, str] = {}
+
+    async def get_stats(self, *, conditional: bool = False) -> StatsResponse:
+        """Get the stats from the API.
+
+        A conditional request sends the validators of the last response along,
+        and a 304 response code means the stats did not change since.
+        """
+        headers = self._get_headers()
+        if conditional:
+            headers.update(self.stats_validators)
+        start = time.monotonic()
+        response = await self._async_get_stats(headers)
+        self.metrics.stats.record(response.response_code, time.monotonic() - start)
+        return response
+
+    async def add_points(self, points: Sequence[DawarichPoint]) -> AddOnePointResponse:
+        """Upload a batch of points in a single Overland request."""
+        body = json_bytes(
+            {"locations": [point.as_feature(len(points)) for point in points]}
+        )
+        start = time.monotonic()
+        response = await self._async_post_batch(body, len(points))
+        self.metrics.uploads.record(
+            response.response_code, time.monotonic() - start, len(body)
+        )
+        return response
+
+    async def _async_get_stats(self, headers: dict[str, str]) -> StatsResponse:
+        try:
+            async with self.pool.request(
+                "GET", self._build_url(API_V1_STATS_PATH), headers=headers
+            ) as response:
+                if response.status == 304:
+                    return StatsResponse(response_code=response.status)
+                response.raise_for_status()
+                data = await response.json()
+                self.stats_validators = {
+                    request_header: value
+                    for response_header, request_header in STATS_VALIDATORS
+                    if (value := response.headers.get(response_header)) is not None
+                }
+                return StatsResponse(
+                    response_code=response.status,
+                    response=StatsResponseModel.parse_obj(data),
+                )
+        except aiohttp.ClientResponseError as err:
+            return StatsResponse(
+                response_code=err.status, response=None, error=err.message
+            )
+        except aiohttp.ClientError as err:
+            _LOGGER.debug("Failed to get stats: %s", err)
+            return StatsResponse(response_code=500, response=None, error=str(err))
+        except TimeoutError:
+            return StatsResponse(response_code=408, response=None, error="Timeout")
+
+    async def _async_post_batch(self, body: bytes, count: int) -> AddOnePointResponse:
+        try:
+            async with self.pool.request(
+                "POST",
+                self._build_url(API_V1_BATCHES_PATH),
+                data=body,
+                headers=self._get_headers(),
+            ) as response:
+                response.raise_for_status()
+                return AddOnePointResponse(
+                    response_code=response.status,
+                    response=None,
+                    error=response.reason or "",
+                )
+        except aiohttp.ClientResponseError as err:
+            return AddOnePointResponse(
+                response_code=err.status, response=None, error=err.message
+            )
+        except aiohttp.ClientError as err:
+            _LOGGER.debug("Failed to add %s points: %s", count, err)
+            return AddOnePointResponse(response_code=500, response=None, error=str(err))
+        except TimeoutError:
+            return AddOnePointResponse(
+                response_code=408, response=None, error="Timeout"
+            )
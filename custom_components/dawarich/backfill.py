@@ -0,0 +1,135 @@
+"""Backfill Dawarich with device_tracker history from the recorder."""
+
+import asyncio
+import logging
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import DawarichPoint
+from .const import DOMAIN
+from .filters import DawarichPointFilter
+from .pipeline import DawarichPointPipeline
+from .uploader import DawarichUploader
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKFILL_CHUNK = timedelta(hours=6)
+STORAGE_VERSION = 1
+
+
+class DawarichBackfill:
+    """Upload the recorded history of device_trackers to Dawarich.
+
+    History is read from the recorder one ``BACKFILL_CHUNK`` at a time, so
+    memory use does not depend on the length of the range. The points are
+    queued like live fixes on the uploaders of the server and its mirrors, so
+    they go through the durable outboxes and their deduplication. The end of
+    every chunk is stored as a checkpoint once its points are in the outboxes,
+    and running the backfill again for the same range continues after the last
+    checkpoint. The backfills of an entry share the checkpoints and the
+    ``lock``, so they run one after the other.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        uploaders: Sequence[DawarichUploader],
+        entry_id: str,
+        options: Mapping[str, Any],
+        lock: asyncio.Lock,
+    ) -> None:
+        """Initialize the backfill."""
+        self._hass = hass
+        self._uploaders = uploaders
+        self._lock = lock
+        self._options = options
+        self._store = Store[dict[str, str]](
+            hass, STORAGE_VERSION, f"{DOMAIN}.backfill.{entry_id}"
+        )
+
+    async def async_run(
+        self, devices: Mapping[str, str], start: datetime, end: datetime
+    ) -> None:
+        """Backfill every device from ``start`` until ``end``."""
+        async with self._lock:
+            await self._async_run(devices, start, end)
+
+    async def _async_run(
+        self, devices: Mapping[str, str], start: datetime, end: datetime
+    ) -> None:
+        checkpoints = await self._store.async_load() or {}
+        for entity_id, device_id in devices.items():
+            resume_from = start
+            if (checkpoint := checkpoints.get(entity_id)) is not None and (
+                start < (done := dt_util.parse_datetime(checkpoint) or start) < end
+            ):
+                _LOGGER.info("Resuming backfill of %s from %s", entity_id, done)
+                resume_from = done
+
+            uploaded = 0
+            point_filter = DawarichPointFilter.from_options(self._options)
+            pipeline = DawarichPointPipeline.from_options(self._options, entity_id)
+            chunk_start = resume_from
+            while chunk_start < end:
+                chunk_end = min(chunk_start + BACKFILL_CHUNK, end)
+                points = []
+                for state in await self._async_read_chunk(
+                    entity_id, chunk_start, chunk_end
+                ):
+                    if point := pipeline(device_id, state, state.last_updated):
+                        points.extend(point_filter.process(point))
+                points.extend(point_filter.flush())
+
+                if not await self._async_queue(points):
+                    _LOGGER.error(
+                        "Backfill of %s stopped at %s, run it again to resume",
+                        entity_id,
+                        chunk_start,
+                    )
+                    return
+                uploaded += len(points)
+                checkpoints[entity_id] = chunk_end.isoformat()
+                await self._store.async_save(checkpoints)
+                chunk_start = chunk_end
+
+            _LOGGER.info(
+                "Queued %s backfilled points of %s (%s)",
+                uploaded,
+                entity_id,
+                dict(point_filter.counters),
+            )
+
+    async def _async_read_chunk(
+        self, entity_id: str, start: datetime, end: datetime
+    ) -> list[State]:
+        """Read the recorded states of one entity in a time range.
+
+        Every recorded state is read, including those where only the
+        attributes changed, as a new fix usually keeps the state of the tracker.
+        """
+        states = await get_instance(self._hass).async_add_executor_job(
+            partial(
+                history.get_significant_states,
+                self._hass,
+                start,
+                end,
+                [entity_id],
+                include_start_time_state=False,
+                significant_changes_only=False,
+            )
+        )
+        return states.get(entity_id, [])
+
+    async def _async_queue(self, points: list[DawarichPoint]) -> bool:
+        """Queue points for upload and return whether all reached the outboxes."""
+        for uploader in self._uploaders:
+            for point in points:
+                uploader.async_enqueue(point)
+        return all([await uploader.async_write() for uploader in self._uploaders])
@@ -14,31 +14,89 @@ from homeassistant.const import (
     CONF_SSL,
     CONF_VERIFY_SSL,
 )
+from homeassistant.core import callback
 from homeassistant.helpers import selector
 
 from .const import (
-    CONF_DEVICE,
+    CONF_ATTRIBUTES,
+    CONF_BATCH_SIZE,
+    CONF_CACHE_TTL,
+    CONF_CONDITIONAL_REQUESTS,
+    CONF_DEVICE_OVERRIDES,
+    CONF_DEVICES,
+    CONF_FAST_START,
+    CONF_FLUSH_INTERVAL,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_ACCURACY,
+    CONF_MAX_CONNECTIONS,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_DISTANCE,
+    CONF_MIN_INTERVAL,
+    CONF_MIRRORS,
+    CONF_MOBILE_APP_STREAM,
+    CONF_POLL_INTERVAL,
+    CONF_PUSH_MODE,
+    CONF_QUEUE_MODE,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_UNITS,
+    DEFAULT_CONDITIONAL_REQUESTS,
+    DEFAULT_FAST_START,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MIN_DISTANCE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_MOBILE_APP_STREAM,
     DEFAULT_NAME,
     DEFAULT_PORT,
+    DEFAULT_PUSH_MODE,
+    DEFAULT_QUEUE_MODE,
+    DEFAULT_SIMPLIFY_TOLERANCE,
     DEFAULT_SSL,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    MAX_CONNECTIONS_PER_HOST,
+    MAX_UPDATE_INTERVAL,
+    QUEUE_MODE_LATEST,
+    QUEUE_MODE_QUEUE,
+    STATS_CACHE_TTL,
+    UPDATE_INTERVAL,
+    UPLOAD_BATCH_SIZE,
+    UPLOAD_FLUSH_INTERVAL,
 )
-from .helpers import get_api
+from .pipeline import ATTRIBUTES_SCHEMA, DEVICE_OVERRIDES_SCHEMA, UNITS_SCHEMA
+from .probe import DawarichProbe
 
 _LOGGER = logging.getLogger(__name__)
 
+# Options edited as YAML, with the schemas they must match.
+PIPELINE_SCHEMAS = {
+    CONF_ATTRIBUTES: ATTRIBUTES_SCHEMA,
+    CONF_UNITS: UNITS_SCHEMA,
+    CONF_DEVICE_OVERRIDES: DEVICE_OVERRIDES_SCHEMA,
+}
+
 
 class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Dawarich."""
 
-    VERSION = 2
+    VERSION = 3
 
     def __init__(self):
         """Initialize Dawarich config flow."""
         self._config: dict = {}
+        self._probe: DawarichProbe | None = None
         self.runtime_data: Any = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "DawarichOptionsFlow":
+        """Get the options flow for this handler."""
+        return DawarichOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -51,7 +109,7 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_NAME: user_input[CONF_NAME],
                 CONF_SSL: user_input[CONF_SSL],
                 CONF_VERIFY_SSL: user_input[CONF_VERIFY_SSL],
-                CONF_DEVICE: user_input.get(CONF_DEVICE),
+                CONF_DEVICES: user_input.get(CONF_DEVICES, []),
             }
 
             self._async_abort_entries_match(
@@ -82,9 +140,13 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_NAME, default=user_input.get(CONF_NAME, DEFAULT_NAME)
                     ): str,
                     vol.Optional(
-                        CONF_DEVICE, msg="If you want to track your device"
+                        CONF_DEVICES,
+                        default=user_input.get(CONF_DEVICES, []),
+                        msg="If you want to track your devices",
                     ): selector.EntitySelector(
-                        selector.EntitySelectorConfig(domain="device_tracker")
+                        selector.EntitySelectorConfig(
+                            domain="device_tracker", multiple=True
+                        )
                     ),
                     vol.Required(
                         CONF_SSL, default=user_input.get(CONF_SSL, DEFAULT_SSL)
@@ -162,24 +224,174 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _async_test_connect(self) -> dict[str, str]:
-        # Test and make sure the API key is valid
-        if CONF_API_KEY not in self._config:
-            return {CONF_API_KEY: "no api key"}
-
-        host = self._config[CONF_HOST]
-        use_ssl = self._config[CONF_SSL]
-        api_key = self._config[CONF_API_KEY]
-
-        api = get_api(host, api_key, use_ssl)
-
-        # TODO: We should do a health check to see if the API is reachable
-        # that way we can display if it is a connection issue or an invalid API key
-        api_stats = await api.get_stats()
-
-        match api_stats.response_code:
-            case 200:
-                return {}
-            case 401:
-                return {CONF_API_KEY: "invalid api key"}
-            case _:
-                return {"base": "connection error"}
+        """Probe the configured server and return the errors to show."""
+        if self._probe is None:
+            self._probe = DawarichProbe(self.hass)
+        result = await self._probe.async_probe(
+            self._config[CONF_HOST],
+            self._config[CONF_SSL],
+            self._config[CONF_VERIFY_SSL],
+            self._config.get(CONF_API_KEY),
+        )
+        if result.error is None and CONF_API_KEY not in self._config:
+            # The server is reachable, ask for the API key next.
+            return {CONF_API_KEY: "missing_api_key"}
+        return result.errors
+
+
+class DawarichOptionsFlow(config_entries.OptionsFlow):
+    """Tune the polling, uploads and filtering of a running entry.
+
+    The options in ``LIVE_OPTIONS`` are applied without reloading the entry,
+    changing any other one reloads it.
+    """
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        options: Mapping[str, Any] = self.config_entry.options
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            for key, schema in PIPELINE_SCHEMAS.items():
+                try:
+                    # A cleared mapping is left out of the input.
+                    user_input[key] = schema(user_input.get(key) or {})
+                except vol.Invalid:
+                    errors[key] = "invalid_mapping"
+            if not errors:
+                return self.async_create_entry(data={**options, **user_input})
+            options = {**options, **user_input}
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_POLL_INTERVAL,
+                        default=options.get(
+                            CONF_POLL_INTERVAL, int(UPDATE_INTERVAL.total_seconds())
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                    vol.Required(
+                        CONF_MAX_POLL_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_POLL_INTERVAL,
+                            int(MAX_UPDATE_INTERVAL.total_seconds()),
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                    vol.Required(
+                        CONF_BATCH_SIZE,
+                        default=options.get(CONF_BATCH_SIZE, UPLOAD_BATCH_SIZE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                    vol.Required(
+                        CONF_FLUSH_INTERVAL,
+                        default=options.get(
+                            CONF_FLUSH_INTERVAL,
+                            int(UPLOAD_FLUSH_INTERVAL.total_seconds()),
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_QUEUE_MODE,
+                        default=options.get(CONF_QUEUE_MODE, DEFAULT_QUEUE_MODE),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[QUEUE_MODE_QUEUE, QUEUE_MODE_LATEST],
+                            translation_key=CONF_QUEUE_MODE,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_MAX_IN_FLIGHT,
+                        default=options.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Required(
+                        CONF_MAX_ACCURACY,
+                        default=options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_MIN_DISTANCE,
+                        default=options.get(CONF_MIN_DISTANCE, DEFAULT_MIN_DISTANCE),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_MIN_INTERVAL,
+                        default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_SIMPLIFY_TOLERANCE,
+                        default=options.get(
+                            CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_MAX_CONNECTIONS,
+                        default=options.get(
+                            CONF_MAX_CONNECTIONS, MAX_CONNECTIONS_PER_HOST
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Required(
+                        CONF_PUSH_MODE,
+                        default=options.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE),
+                    ): bool,
+                    vol.Required(
+                        CONF_FAST_START,
+                        default=options.get(CONF_FAST_START, DEFAULT_FAST_START),
+                    ): bool,
+                    vol.Required(
+                        CONF_CACHE_TTL,
+                        default=options.get(
+                            CONF_CACHE_TTL, int(STATS_CACHE_TTL.total_seconds())
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_CONDITIONAL_REQUESTS,
+                        default=options.get(
+                            CONF_CONDITIONAL_REQUESTS, DEFAULT_CONDITIONAL_REQUESTS
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_IMPORT_STATISTICS,
+                        default=options.get(
+                            CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_MOBILE_APP_STREAM,
+                        default=options.get(
+                            CONF_MOBILE_APP_STREAM, DEFAULT_MOBILE_APP_STREAM
+                        ),
+                    ): bool,
+                    **self._mirror_fields(options),
+                    **{
+                        vol.Optional(
+                            key,
+                            description={"suggested_value": options.get(key, {})},
+                        ): selector.ObjectSelector()
+                        for key in PIPELINE_SCHEMAS
+                    },
+                }
+            ),
+            errors=errors,
+        )
+
+    def _mirror_fields(self, options: Mapping[str, Any]) -> dict[Any, Any]:
+        """Return the field to mirror the points to the servers of other entries."""
+        targets = [
+            selector.SelectOptionDict(value=entry.entry_id, label=entry.title)
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id != self.config_entry.entry_id
+        ]
+        if not targets:
+            return {}
+        known = {target["value"] for target in targets}
+        return {
+            vol.Optional(
+                CONF_MIRRORS,
+                default=[
+                    target_id
+                    for target_id in options.get(CONF_MIRRORS, [])
+                    if target_id in known
+                ],
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(options=targets, multiple=True)
+            ),
+        }
@@ -4,6 +4,7 @@ from datetime import timedelta
 from enum import Enum
 
 DOMAIN = "dawarich"
+DATA_CONNECTION_POOLS = f"{DOMAIN}_connection_pools"
 
 
 DEFAULT_PORT = 80
@@ -11,7 +12,75 @@ DEFAULT_NAME = "Dawarich"
 DEFAULT_SSL = False
 DEFAULT_VERIFY_SSL = True
 CONF_DEVICE = "mobile_app"
+CONF_DEVICES = "devices"
+CONF_POLL_INTERVAL = "poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+CONF_MIN_DISTANCE = "min_distance"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_ACCURACY = "max_accuracy"
+CONF_SIMPLIFY_TOLERANCE = "simplify_tolerance"
+CONF_QUEUE_MODE = "queue_mode"
+CONF_MAX_IN_FLIGHT = "max_in_flight"
+CONF_FAST_START = "fast_start"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_CONDITIONAL_REQUESTS = "conditional_requests"
+CONF_PUSH_MODE = "push_mode"
+CONF_ATTRIBUTES = "attributes"
+CONF_UNITS = "units"
+CONF_DEVICE_OVERRIDES = "device_overrides"
+CONF_MIRRORS = "mirrors"
+CONF_BATCH_SIZE = "batch_size"
+CONF_FLUSH_INTERVAL = "flush_interval"
+CONF_MAX_CONNECTIONS = "max_connections"
+QUEUE_MODE_QUEUE = "queue"
+QUEUE_MODE_LATEST = "latest"
 UPDATE_INTERVAL = timedelta(seconds=60)
+MAX_UPDATE_INTERVAL = timedelta(minutes=30)
+UPDATE_BACKOFF_FACTOR = 2
+REQUEST_TIMEOUT = 30
+PROBE_TIMEOUT = 3
+PROBE_AUTH_TIMEOUT = 5
+MAX_CONNECTIONS_PER_HOST = 4
+UPLOAD_BATCH_SIZE = 50
+UPLOAD_FLUSH_INTERVAL = timedelta(seconds=5)
+UPLOAD_RETRY_INTERVAL = timedelta(seconds=10)
+UPLOAD_RETRY_MAX_INTERVAL = timedelta(minutes=15)
+DEFAULT_MIN_DISTANCE = 0
+DEFAULT_MIN_INTERVAL = 0
+DEFAULT_MAX_ACCURACY = 0
+DEFAULT_SIMPLIFY_TOLERANCE = 0
+DEFAULT_QUEUE_MODE = QUEUE_MODE_QUEUE
+DEFAULT_MAX_IN_FLIGHT = 100
+DEFAULT_FAST_START = True
+DEFAULT_CONDITIONAL_REQUESTS = True
+STATS_CACHE_TTL = timedelta(days=1)
+DEFAULT_PUSH_MODE = False
+PUSH_SAFETY_INTERVAL = timedelta(hours=6)
+PUSH_REFRESH_COOLDOWN = 10
+EVENT_ZONE_ENTERED = f"{DOMAIN}_zone_entered"
+EVENT_ZONE_LEFT = f"{DOMAIN}_zone_left"
+CONF_IMPORT_STATISTICS = "import_statistics"
+DEFAULT_IMPORT_STATISTICS = True
+CONF_MOBILE_APP_STREAM = "mobile_app_stream"
+DEFAULT_MOBILE_APP_STREAM = False
+# Dispatcher signal of the raw location updates of a mobile_app config entry.
+SIGNAL_MOBILE_APP_LOCATION_UPDATE = "mobile_app_location_update_{}"
+
+# Keys of the monthly distances in the yearly stats.
+MONTHS = (
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+)
 
 
 class DawarichTrackerStates(Enum):
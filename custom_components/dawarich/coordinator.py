@@ -1,39 +1,255 @@
 """Custom coordinator for Dawarich integration."""
 
 import logging
-from typing import Any
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-from dawarich_api import DawarichAPI
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import UPDATE_INTERVAL
+from .const import (
+    MAX_UPDATE_INTERVAL,
+    PUSH_REFRESH_COOLDOWN,
+    STATS_CACHE_TTL,
+    UPDATE_BACKOFF_FACTOR,
+    UPDATE_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from .api import DawarichClient
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds to wait before writing a stats snapshot to disk.
+SNAPSHOT_SAVE_DELAY = 10
+
 
 class DawarichCoordinator(DataUpdateCoordinator):
-    """Custom coordinator."""
+    """Custom coordinator.
+
+    Polls every ``min_interval`` while the stats change, and backs off
+    geometrically up to ``max_interval`` while consecutive polls return the same
+    stats. Uploading points resets the interval to ``min_interval``.
+
+    Listeners are only called when the stats changed, and ``changed_keys`` holds
+    the keys that differ from the previous snapshot so entities can skip writing
+    a state that did not change. The yearly breakdown is kept in ``periods``,
+    with the years that changed in the last refresh in ``changed_periods``.
+
+    With a ``store``, every fetched snapshot is persisted, and ``async_restore``
+    seeds the coordinator with it so entities have a state before the first
+    refresh completed. When a refresh fails, the last snapshot keeps being
+    served with ``stale`` set for up to ``cache_ttl`` after it was fetched,
+    while retries back off with jitter.
+
+    In ``push`` mode refreshes are requested by successful uploads instead,
+    and a burst of uploads within ``PUSH_REFRESH_COOLDOWN`` seconds leads to a
+    single refresh at its end.
+    """
 
-    def __init__(self, hass: HomeAssistant, api: DawarichAPI):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: "DawarichClient",
+        *,
+        min_interval: timedelta = UPDATE_INTERVAL,
+        max_interval: timedelta = MAX_UPDATE_INTERVAL,
+        store: Store[dict[str, Any]] | None = None,
+        cache_ttl: timedelta = STATS_CACHE_TTL,
+        conditional: bool = False,
+        push: bool = False,
+    ):
         """Initialize coordinator."""
         super().__init__(
-            hass, _LOGGER, name="Dawarich Sensor", update_interval=UPDATE_INTERVAL
+            hass,
+            _LOGGER,
+            name="Dawarich Sensor",
+            update_interval=min_interval,
+            always_update=False,
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=PUSH_REFRESH_COOLDOWN, immediate=False
+            )
+            if push
+            else None,
         )
         self.api = api
+        self.changed_keys: frozenset[str] = frozenset()
+        self.periods: dict[int, dict[str, Any]] = {}
+        self.changed_periods: frozenset[int] = frozenset()
+        self.propagated_updates: Counter[str] = Counter()
+        self.skipped_updates: Counter[str] = Counter()
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.cache_ttl = cache_ttl
+        self.conditional = conditional
+        self.stale = False
+        self.fetched: datetime | None = None
+        self._unchanged_polls = 0
+        self._failed_polls = 0
+        self._store = store
+
+    async def async_restore(self) -> bool:
+        """Seed the stats with the persisted snapshot and return whether it existed.
+
+        Snapshots older than ``cache_ttl`` are not restored.
+        """
+        if self._store is None or (snapshot := await self._store.async_load()) is None:
+            return False
+        fetched = dt_util.parse_datetime(snapshot.get("fetched") or "")
+        if fetched is None or dt_util.utcnow() - fetched > self.cache_ttl:
+            return False
+        data = snapshot["data"]
+        self.api.stats_validators = snapshot.get("validators", {})
+        self.changed_keys = frozenset(data)
+        self._async_update_periods(data)
+        self.data = data
+        self.fetched = fetched
+        self.stale = True
+        return True
+
+    @callback
+    def async_set_intervals(
+        self, min_interval: timedelta, max_interval: timedelta
+    ) -> None:
+        """Change the polling intervals and poll again at the shortest one."""
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self._unchanged_polls = 0
+        self.update_interval = self.min_interval
+        self._schedule_refresh()
+
+    @callback
+    def async_points_uploaded(self, *, refresh: bool = False) -> None:
+        """Refresh, or poll fast again, now that new points reached Dawarich."""
+        self._unchanged_polls = 0
+        if refresh:
+            self.hass.async_create_task(self.async_request_refresh())
+        elif self.update_interval != self.min_interval:
+            self.update_interval = self.min_interval
+            self._schedule_refresh()
+
+    @callback
+    def _async_adapt_interval(self, data: dict[str, Any]) -> None:
+        """Back off while the stats do not change."""
+        if data != self.data:
+            self._unchanged_polls = 0
+        elif self.update_interval is None or self.update_interval < self.max_interval:
+            self._unchanged_polls += 1
+        else:
+            return
+        self.update_interval = min(
+            self.min_interval * UPDATE_BACKOFF_FACTOR**self._unchanged_polls,
+            self.max_interval,
+        )
+
+    @callback
+    def _async_update_periods(self, data: dict[str, Any]) -> None:
+        """Update the cached yearly breakdown from a changed snapshot."""
+        if "yearly_stats" not in self.changed_keys:
+            self.changed_periods = frozenset()
+            return
+        periods = {}
+        changed = set()
+        for year_stats in data["yearly_stats"]:
+            year = year_stats["year"]
+            periods[year] = year_stats
+            if self.periods.get(year) != year_stats:
+                changed.add(year)
+        self.periods = periods
+        self.changed_periods = frozenset(changed)
+
+    @callback
+    def _async_set_stale(self, stale: bool) -> None:
+        """Update the stale marker, notifying listeners if the stats stay the same."""
+        if self.stale == stale:
+            return
+        self.stale = stale
+        if not self.changed_keys:
+            self.async_update_listeners()
+
+    @callback
+    def _async_fetched(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Accept a fresh snapshot of the stats."""
+        previous = self.data or {}
+        self.changed_keys = frozenset(
+            key
+            for key, value in data.items()
+            if key not in previous or previous[key] != value
+        )
+        self._async_update_periods(data)
+        self._async_adapt_interval(data)
+        self._failed_polls = 0
+        self.fetched = dt_util.utcnow()
+        self._async_set_stale(False)
+        if self._store is not None:
+            self._store.async_delay_save(
+                lambda: {
+                    "data": data,
+                    "fetched": self.fetched.isoformat() if self.fetched else None,
+                    "validators": self.api.stats_validators,
+                },
+                SNAPSHOT_SAVE_DELAY,
+            )
+        return data
+
+    @callback
+    def _async_serve_stale(self) -> bool:
+        """Keep serving the last snapshot if it is recent enough.
+
+        Retries back off geometrically from ``UPDATE_INTERVAL`` up to
+        ``MAX_UPDATE_INTERVAL`` with random jitter, so several entries do not
+        hit a recovering server at once. This does not depend on the polling
+        intervals, which in push mode are hours long.
+        """
+        if (
+            self.data is None
+            or self.fetched is None
+            or dt_util.utcnow() - self.fetched > self.cache_ttl
+        ):
+            return False
+        self._failed_polls += 1
+        backoff = min(
+            UPDATE_INTERVAL * UPDATE_BACKOFF_FACTOR ** min(self._failed_polls - 1, 16),
+            MAX_UPDATE_INTERVAL,
+        )
+        self.update_interval = backoff * random.uniform(0.5, 1.0)
+        self.changed_keys = frozenset()
+        self.changed_periods = frozenset()
+        self._async_set_stale(True)
+        return True
 
     async def _async_update_data(self) -> dict[str, Any]:
-        response = await self.api.get_stats()
+        response = await self.api.get_stats(
+            conditional=self.conditional and self.data is not None
+        )
         match response.response_code:
             case 200:
-                return response.response.dict()  # type: ignore[unknown-attr]
+                return self._async_fetched(
+                    response.response.dict()  # type: ignore[unknown-attr]
+                )
+            case 304:
+                return self._async_fetched(self.data)
             case 401:
                 _LOGGER.error(
                     "Invalid credentials when trying to fetch stats from Dawarich"
                 )
                 raise ConfigEntryAuthFailed("Invalid API key")
             case _:
+                if self._async_serve_stale():
+                    _LOGGER.warning(
+                        "Error fetching data from Dawarich (status %s) %s, "
+                        "serving the stats fetched at %s",
+                        response.response_code,
+                        response.error,
+                        self.fetched,
+                    )
+                    return self.data
                 _LOGGER.error(
                     "Error fetching data from Dawarich (status %s) %s",
                     response.response_code,
@@ -0,0 +1,66 @@
+"""Diagnostics support for the Dawarich integration."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from . import DawarichConfigEntry
+from .uploader import DawarichUploader
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: DawarichConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data = entry.runtime_data
+    update_interval = runtime_data.coordinator.update_interval
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "update_interval": update_interval and update_interval.total_seconds(),
+            "stale": runtime_data.coordinator.stale,
+            "fetched": runtime_data.coordinator.fetched,
+            "propagated_updates": dict(runtime_data.coordinator.propagated_updates),
+            "skipped_updates": dict(runtime_data.coordinator.skipped_updates),
+        },
+        "uploader": _uploader_diagnostics(runtime_data.uploader),
+        "mirrors": {
+            target_id: _uploader_diagnostics(mirror)
+            for target_id, mirror in runtime_data.mirrors.items()
+        },
+        "requests": runtime_data.api.metrics.as_dict(),
+        "zones": len(runtime_data.tracker.zones),
+        "devices": {
+            entity_id: {
+                "device_id": device.device_id,
+                "in_flight": device.in_flight,
+                "held": device.held is not None,
+                "coalesced": device.coalesced,
+                "zone": None
+                if device.visit.zone is None
+                else device.visit.zone.entity_id,
+                "point_filter": dict(device.point_filter.counters),
+            }
+            for entity_id, device in runtime_data.tracker.devices.items()
+        },
+    }
+
+
+def _uploader_diagnostics(uploader: DawarichUploader) -> dict[str, Any]:
+    """Return the queue and health of an uploader."""
+    return {
+        "queue_depth": uploader.queue_depth,
+        "last_flush_latency": uploader.last_flush_latency,
+        "healthy": uploader.healthy,
+        "uploaded": uploader.uploaded,
+        "duplicates": uploader.duplicates,
+        "throughput": uploader.throughput,
+        "last_success": uploader.last_success,
+    }
@@ -0,0 +1,167 @@
+"""Client-side thinning of tracker points before they are uploaded."""
+
+import math
+from collections import Counter
+from collections.abc import Mapping
+from typing import Any
+
+from .api import DawarichPoint
+from .const import (
+    CONF_MAX_ACCURACY,
+    CONF_MIN_DISTANCE,
+    CONF_MIN_INTERVAL,
+    CONF_SIMPLIFY_TOLERANCE,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MIN_DISTANCE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+)
+from .helpers import EARTH_RADIUS_M, haversine
+
+SIMPLIFY_WINDOW = 16
+
+
+class DawarichPointFilter:
+    """Drop tracker points that add nothing to the track.
+
+    Points are dropped when they repeat the last accepted coordinates, lie within
+    ``min_distance`` metres of it, arrive less than ``min_interval`` seconds after
+    it, or report an accuracy worse than ``max_accuracy`` metres. A value of 0
+    disables the corresponding check.
+
+    With a ``simplify_tolerance`` the accepted points are additionally run through
+    Douglas-Peucker in windows of ``simplify_window`` points, so up to that many
+    points are held back until the window is full.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_distance: float = 0,
+        min_interval: float = 0,
+        max_accuracy: float = 0,
+        simplify_tolerance: float = 0,
+        simplify_window: int = SIMPLIFY_WINDOW,
+    ) -> None:
+        """Initialize the filter."""
+        self.min_distance = min_distance
+        self.min_interval = min_interval
+        self.max_accuracy = max_accuracy
+        self.simplify_tolerance = simplify_tolerance
+        self.simplify_window = max(simplify_window, 3)
+        self.counters: Counter[str] = Counter()
+        self._last: DawarichPoint | None = None
+        self._window: list[DawarichPoint] = []
+        self._anchor_released = False
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "DawarichPointFilter":
+        """Create a filter from the options of a config entry."""
+        return cls(
+            min_distance=options.get(CONF_MIN_DISTANCE, DEFAULT_MIN_DISTANCE),
+            min_interval=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            max_accuracy=options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY),
+            simplify_tolerance=options.get(
+                CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+            ),
+        )
+
+    def process(self, point: DawarichPoint) -> list[DawarichPoint]:
+        """Return the points that are ready to be uploaded after ``point``."""
+        self.counters["received"] += 1
+        if (reason := self._reject_reason(point)) is not None:
+            self.counters[reason] += 1
+            return []
+        self._last = point
+
+        if not self.simplify_tolerance:
+            self.counters["accepted"] += 1
+            return [point]
+
+        self._window.append(point)
+        if len(self._window) < self.simplify_window:
+            return []
+        return self._simplify_window()
+
+    def flush(self) -> list[DawarichPoint]:
+        """Release the points held back by the simplifier."""
+        if not self._window or (len(self._window) == 1 and self._anchor_released):
+            return []
+        return self._simplify_window()
+
+    def _reject_reason(self, point: DawarichPoint) -> str | None:
+        if (
+            self.max_accuracy
+            and point.horizontal_accuracy is not None
+            and point.horizontal_accuracy > self.max_accuracy
+        ):
+            return "inaccurate"
+        if (last := self._last) is None:
+            return None
+        if point.latitude == last.latitude and point.longitude == last.longitude:
+            return "duplicate"
+        if (
+            self.min_interval
+            and (point.timestamp - last.timestamp).total_seconds() < self.min_interval
+        ):
+            return "too_soon"
+        if self.min_distance and (
+            haversine(last.latitude, last.longitude, point.latitude, point.longitude)
+            < self.min_distance
+        ):
+            return "too_close"
+        return None
+
+    def _simplify_window(self) -> list[DawarichPoint]:
+        """Simplify the window and keep its last point as the next anchor.
+
+        The first point of the window has already been released, as the last
+        point of the previous window, unless this is the very first window.
+        """
+        window = self._window
+        keep = _douglas_peucker(window, self.simplify_tolerance)
+        self.counters["simplified"] += len(window) - len(keep)
+        released = [
+            window[index] for index in keep if index or not self._anchor_released
+        ]
+        self.counters["accepted"] += len(released)
+        self._window = [window[-1]]
+        self._anchor_released = True
+        return released
+
+
+def _douglas_peucker(points: list[DawarichPoint], tolerance: float) -> list[int]:
+    """Return the sorted indices of the points kept by Douglas-Peucker."""
+    if len(points) < 3:
+        return list(range(len(points)))
+    origin = points[0]
+    scale = math.cos(math.radians(origin.latitude))
+    xy = [
+        (
+            math.radians(point.longitude - origin.longitude) * scale * EARTH_RADIUS_M,
+            math.radians(point.latitude - origin.latitude) * EARTH_RADIUS_M,
+        )
+        for point in points
+    ]
+
+    keep = {0, len(points) - 1}
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        (x1, y1), (x2, y2) = xy[start], xy[end]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        max_distance, max_index = 0.0, start
+        for index in range(start + 1, end):
+            x, y = xy[index]
+            if length:
+                distance = abs(dy * (x - x1) - dx * (y - y1)) / length
+            else:
+                distance = math.hypot(x - x1, y - y1)
+            if distance > max_distance:
+                max_distance, max_index = distance, index
+        if max_distance > tolerance:
+            keep.add(max_index)
+            stack.append((start, max_index))
+            stack.append((max_index, end))
+    return sorted(keep)
@@ -1,13 +1,75 @@
 """Helper functions for the Dawarich integration."""
 
-from dawarich_api import DawarichAPI
+import math
 
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-def get_api(host: str, api_key: str, use_ssl: bool) -> DawarichAPI:
-    """Get the API object."""
+from .api import DawarichClient, DawarichConnectionPool
+from .const import DATA_CONNECTION_POOLS, MAX_CONNECTIONS_PER_HOST
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def get_api(
+    hass: HomeAssistant,
+    host: str,
+    api_key: str,
+    use_ssl: bool,
+    verify_ssl: bool,
+    *,
+    pooled: bool = True,
+) -> DawarichClient:
+    """Get the API object.
+
+    Without ``pooled`` the client gets a connection pool of its own that is
+    not registered, for throwaway clients like those of the config flow.
+    """
     url = host.removeprefix("http://").removeprefix("https://")
     if use_ssl:
         url = f"https://{url}"
     else:
         url = f"http://{url}"
-    return DawarichAPI(url=url, api_key=api_key)
+    if pooled:
+        pool = get_connection_pool(hass, url, verify_ssl)
+    else:
+        pool = DawarichConnectionPool(
+            async_get_clientsession(hass, verify_ssl), MAX_CONNECTIONS_PER_HOST
+        )
+    return DawarichClient(url=url, api_key=api_key, pool=pool)
+
+
+def get_connection_pool(
+    hass: HomeAssistant, url: str, verify_ssl: bool
+) -> DawarichConnectionPool:
+    """Get the connection pool shared by every client of a Dawarich host."""
+    pools: dict[tuple[str, bool], DawarichConnectionPool] = hass.data.setdefault(
+        DATA_CONNECTION_POOLS, {}
+    )
+    if (pool := pools.get((url, verify_ssl))) is None:
+        pool = pools[url, verify_ssl] = DawarichConnectionPool(
+            async_get_clientsession(hass, verify_ssl), MAX_CONNECTIONS_PER_HOST
+        )
+    return pool
+
+
+def get_tracked_devices(name: str, devices: list[str]) -> dict[str, str]:
+    """Map each tracked entity to the device id its points are uploaded under.
+
+    A single device keeps using the entry name, like before several devices
+    could be tracked from one entry.
+    """
+    if len(devices) == 1:
+        return {devices[0]: name}
+    return {entity_id: entity_id.split(".", 1)[1] for entity_id in devices}
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance in metres between two coordinates."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
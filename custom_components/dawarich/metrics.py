@@ -0,0 +1,128 @@
+"""Request metrics of the Dawarich API client."""
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from .const import REQUEST_TIMEOUT
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float(REQUEST_TIMEOUT),
+)
+LATENCY_WINDOW = 512
+
+
+class DawarichLatencyHistogram:
+    """Histogram of the latencies of the most recent requests.
+
+    The window is a ring buffer of bucket indexes, and a sample leaving the
+    window is subtracted from its bucket again, so recording a sample costs a
+    bisect and two counter updates. Samples are only recorded from the event
+    loop, so no lock is needed.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._window: deque[int] = deque(maxlen=window)
+        self._counts = [0] * len(LATENCY_BUCKETS)
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._window)
+
+    def observe(self, seconds: float) -> None:
+        """Record the latency of a request."""
+        if len(self._window) == self._window.maxlen:
+            self._counts[self._window[0]] -= 1
+        bucket = min(bisect_left(LATENCY_BUCKETS, seconds), len(LATENCY_BUCKETS) - 1)
+        self._window.append(bucket)
+        self._counts[bucket] += 1
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding a percentile, in seconds."""
+        if not self._window:
+            return None
+        rank = fraction * len(self._window)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self._counts, strict=True):
+            seen += count
+            if seen >= rank:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the percentiles and buckets of the histogram."""
+        return {
+            "samples": len(self._window),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(LATENCY_BUCKETS, self._counts, strict=True)
+            },
+        }
+
+
+@dataclass(slots=True)
+class DawarichEndpointMetrics:
+    """Counters of the requests to one API endpoint."""
+
+    requests: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    bytes_sent: int = 0
+    last_status: int | None = None
+    latency: DawarichLatencyHistogram = field(default_factory=DawarichLatencyHistogram)
+
+    @property
+    def successes(self) -> int:
+        """Return the number of successful requests."""
+        return self.requests - self.errors
+
+    def record(self, status: int, seconds: float, bytes_sent: int = 0) -> None:
+        """Record the outcome of a request."""
+        self.requests += 1
+        self.bytes_sent += bytes_sent
+        self.last_status = status
+        self.latency.observe(seconds)
+        if not 200 <= status < 400:
+            self.errors += 1
+        if status == 408:
+            self.timeouts += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a JSON serializable dict."""
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "bytes_sent": self.bytes_sent,
+            "last_status": self.last_status,
+            "latency": self.latency.as_dict(),
+        }
+
+
+@dataclass(slots=True)
+class DawarichClientMetrics:
+    """Metrics of the requests made by a Dawarich client."""
+
+    uploads: DawarichEndpointMetrics = field(default_factory=DawarichEndpointMetrics)
+    stats: DawarichEndpointMetrics = field(default_factory=DawarichEndpointMetrics)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a JSON serializable dict."""
+        return {"uploads": self.uploads.as_dict(), "stats": self.stats.as_dict()}
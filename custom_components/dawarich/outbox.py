@@ -0,0 +1,145 @@
+"""Durable on-disk outbox for points waiting to be uploaded to Dawarich."""
+
+import logging
+import sqlite3
+import threading
+from collections.abc import Sequence
+from datetime import UTC
+from pathlib import Path
+
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.json import json_loads_object
+
+from .api import DawarichPoint
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reclaim free pages after this many acknowledged points.
+COMPACT_THRESHOLD = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL
+)
+"""
+
+# Statements upgrading the schema from each version to the next.
+_MIGRATIONS = (
+    (
+        "ALTER TABLE points ADD COLUMN device_id TEXT",
+        "ALTER TABLE points ADD COLUMN timestamp TEXT",
+        "CREATE UNIQUE INDEX points_fix ON points (device_id, timestamp)",
+    ),
+)
+
+
+class DawarichOutbox:
+    """Append-only queue of points stored in SQLite.
+
+    A point is only stored once per device and timestamp, so appending the
+    same fix again while it is waiting does nothing.
+
+    Every method does blocking I/O and must be run in the executor. Calls are
+    serialized with a lock, so the outbox can be used from any executor thread.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the outbox."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._acked_since_compact = 0
+
+    def open(self) -> int:
+        """Open the database and return the number of points it holds."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._migrate(connection)
+            self._connection = connection
+            (count,) = connection.execute("SELECT COUNT(*) FROM points").fetchone()
+            return count
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def append(self, points: Sequence[DawarichPoint]) -> list[DawarichPoint]:
+        """Durably append points to the end of the outbox.
+
+        Return the points left out because they are already waiting.
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                return [
+                    point
+                    for point in points
+                    if not connection.execute(
+                        "INSERT OR IGNORE INTO points (payload, device_id, timestamp) "
+                        "VALUES (?, ?, ?)",
+                        (
+                            json_dumps(point.as_dict()),
+                            point.device_id,
+                            point.timestamp.astimezone(UTC).isoformat(),
+                        ),
+                    ).rowcount
+                ]
+
+    def peek(self, limit: int) -> list[tuple[int, DawarichPoint]]:
+        """Return up to ``limit`` of the oldest points with their row id."""
+        with self._lock:
+            rows = (
+                self._get_connection()
+                .execute("SELECT id, payload FROM points ORDER BY id LIMIT ?", (limit,))
+                .fetchall()
+            )
+        return [
+            (row_id, DawarichPoint.from_dict(json_loads_object(payload)))
+            for row_id, payload in rows
+        ]
+
+    def ack(self, last_id: int) -> None:
+        """Remove every point up to and including ``last_id``."""
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                cursor = connection.execute(
+                    "DELETE FROM points WHERE id <= ?", (last_id,)
+                )
+            self._acked_since_compact += cursor.rowcount
+            if self._acked_since_compact >= COMPACT_THRESHOLD:
+                self._compact(connection)
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """Upgrade the schema of an outbox written by an older version."""
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+        for statements in _MIGRATIONS[version:]:
+            with connection:
+                for statement in statements:
+                    connection.execute(statement)
+                version += 1
+                connection.execute(f"PRAGMA user_version = {version}")
+
+    def _compact(self, connection: sqlite3.Connection) -> None:
+        """Give the space used by acknowledged points back to the filesystem."""
+        connection.execute("PRAGMA incremental_vacuum")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        _LOGGER.debug(
+            "Compacted Dawarich outbox after %s acknowledged points",
+            self._acked_since_compact,
+        )
+        self._acked_since_compact = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            raise RuntimeError("Dawarich outbox is not open")
+        return self._connection
@@ -0,0 +1,183 @@
+"""Turn device_tracker states into Dawarich points."""
+
+import logging
+from collections.abc import Callable, Mapping
+from datetime import datetime
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.const import UnitOfLength, UnitOfSpeed
+from homeassistant.core import State
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import (
+    BaseUnitConverter,
+    DistanceConverter,
+    SpeedConverter,
+)
+
+from .api import DawarichPoint
+from .const import CONF_ATTRIBUTES, CONF_DEVICE_OVERRIDES, CONF_UNITS
+
+_LOGGER = logging.getLogger(__name__)
+
+type Transform = Callable[[Any], Any]
+type FieldSpec = tuple[tuple[str, ...], type[BaseUnitConverter] | None, str | None]
+type Stage = tuple[str, tuple[str, ...], Transform | None]
+
+# Battery states of the mobile apps, mapped to the states Overland knows.
+BATTERY_STATES = {
+    "charging": "charging",
+    "full": "full",
+    "discharging": "unplugged",
+    "not charging": "unplugged",
+    "not_charging": "unplugged",
+    "unplugged": "unplugged",
+}
+
+
+def _battery_state(value: Any) -> str:
+    """Return the Overland battery state of a mobile app battery state."""
+    return BATTERY_STATES.get(str(value).lower(), "unknown")
+
+
+# Point fields with the state attributes they are read from by default, in
+# order of preference, and the unit converter and unit Dawarich expects for
+# them. Speed stays in m/s, like Overland sends it.
+FIELDS: dict[str, FieldSpec] = {
+    "horizontal_accuracy": (("gps_accuracy",), DistanceConverter, UnitOfLength.METERS),
+    "altitude": (("altitude",), DistanceConverter, UnitOfLength.METERS),
+    "vertical_accuracy": (
+        ("vertical_accuracy",),
+        DistanceConverter,
+        UnitOfLength.METERS,
+    ),
+    "speed": (("speed",), SpeedConverter, UnitOfSpeed.METERS_PER_SECOND),
+    "course": (("course",), None, None),
+    "battery_level": (("battery_level", "battery"), None, None),
+    "battery_state": (("battery_state",), None, None),
+}
+
+# Transforms applied to fields that have no unit.
+TRANSFORMS: dict[str, Transform] = {"battery_state": _battery_state}
+
+# Attribute renames and source units, by field, as set in the options.
+ATTRIBUTES_SCHEMA = vol.Schema(
+    {vol.In(("latitude", "longitude", "timestamp", *FIELDS)): cv.string}
+)
+UNITS_SCHEMA = vol.Schema(
+    {
+        vol.In(
+            [field for field, (_, converter, _) in FIELDS.items() if converter]
+        ): cv.string
+    }
+)
+DEVICE_OVERRIDES_SCHEMA = vol.Schema(
+    {
+        cv.entity_id: {
+            vol.Optional(CONF_ATTRIBUTES): ATTRIBUTES_SCHEMA,
+            vol.Optional(CONF_UNITS): UNITS_SCHEMA,
+        }
+    }
+)
+
+
+def _as_datetime(value: Any) -> datetime | None:
+    """Return the time of a datetime, ISO 8601 string or Unix timestamp."""
+    if isinstance(value, datetime):
+        return dt_util.as_utc(value)
+    if isinstance(value, str):
+        parsed = dt_util.parse_datetime(value)
+        return None if parsed is None else dt_util.as_utc(parsed)
+    if isinstance(value, int | float):
+        try:
+            return dt_util.utc_from_timestamp(value)
+        except (OverflowError, OSError, ValueError):
+            return None
+    return None
+
+
+class DawarichPointPipeline:
+    """Read the fields of a point from the attributes of a device_tracker state.
+
+    Attribute renames and units are resolved once, when the pipeline is built,
+    into a tuple of ``(field, attributes, transform)`` stages. Turning a state
+    into a point then only reads the attributes and calls the precompiled unit
+    converters. Points are stamped with the time passed in, usually when the
+    state was updated, unless a ``timestamp`` attribute is configured and set.
+    """
+
+    __slots__ = ("_latitude", "_longitude", "_stages", "_timestamp")
+
+    def __init__(
+        self,
+        attributes: Mapping[str, str] | None = None,
+        units: Mapping[str, str] | None = None,
+    ) -> None:
+        """Compile the pipeline from attribute renames and source units."""
+        attributes = attributes or {}
+        units = units or {}
+        self._latitude = attributes.get("latitude", "latitude")
+        self._longitude = attributes.get("longitude", "longitude")
+        self._timestamp = attributes.get("timestamp")
+        stages = []
+        for field, (names, converter, unit) in FIELDS.items():
+            if field in attributes:
+                names = (attributes[field],)
+            transform = TRANSFORMS.get(field)
+            if (source_unit := units.get(field)) is not None:
+                if converter is None or source_unit not in converter.VALID_UNITS:
+                    _LOGGER.warning(
+                        "Ignoring unsupported unit %s of %s", source_unit, field
+                    )
+                elif source_unit != unit:
+                    transform = converter.converter_factory(source_unit, unit)
+            stages.append((field, names, transform))
+        self._stages: tuple[Stage, ...] = tuple(stages)
+
+    @classmethod
+    def from_options(
+        cls, options: Mapping[str, Any], entity_id: str
+    ) -> "DawarichPointPipeline":
+        """Compile the pipeline of an entity, with its overrides of the options."""
+        override = options.get(CONF_DEVICE_OVERRIDES, {}).get(entity_id, {})
+        return cls(
+            {**options.get(CONF_ATTRIBUTES, {}), **override.get(CONF_ATTRIBUTES, {})},
+            {**options.get(CONF_UNITS, {}), **override.get(CONF_UNITS, {})},
+        )
+
+    def __call__(
+        self, device_id: str, state: State, timestamp: datetime
+    ) -> DawarichPoint | None:
+        """Return the point described by a state, if it has coordinates."""
+        return self.from_attributes(device_id, state.attributes, timestamp)
+
+    def from_attributes(
+        self, device_id: str, attributes: Mapping[str, Any], timestamp: datetime
+    ) -> DawarichPoint | None:
+        """Return the point described by state attributes, if they have coordinates."""
+        latitude = attributes.get(self._latitude)
+        longitude = attributes.get(self._longitude)
+        if latitude is None or longitude is None:
+            return None
+        if self._timestamp is not None:
+            timestamp = _as_datetime(attributes.get(self._timestamp)) or timestamp
+        values = {}
+        for field, names, transform in self._stages:
+            value = None
+            for name in names:
+                if (value := attributes.get(name)) is not None:
+                    break
+            if value is not None and transform is not None:
+                try:
+                    value = transform(value)
+                except (TypeError, ValueError):
+                    value = None
+            values[field] = value
+        return DawarichPoint(
+            device_id=device_id,
+            latitude=latitude,
+            longitude=longitude,
+            timestamp=timestamp,
+            **values,
+        )
@@ -0,0 +1,141 @@
+"""Diagnose the connection to a Dawarich server while it is being configured."""
+
+import asyncio
+import logging
+import ssl
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import partial
+
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ssl import (
+    get_default_context,
+    get_default_no_verify_context,
+)
+from yarl import URL
+
+from .const import PROBE_AUTH_TIMEOUT, PROBE_TIMEOUT
+from .helpers import get_api
+
+_LOGGER = logging.getLogger(__name__)
+
+type ProbeKey = tuple[str, bool, bool, str | None]
+
+
+@dataclass(frozen=True, slots=True)
+class DawarichProbeResult:
+    """Outcome of the checks of a Dawarich server.
+
+    ``error`` is the translation key of the first failed check, and ``field``
+    the form field it belongs to.
+    """
+
+    error: str | None = None
+    field: str = "base"
+    detail: str = ""
+
+    @property
+    def errors(self) -> dict[str, str]:
+        """Return the errors to show in a config flow form."""
+        return {} if self.error is None else {self.field: self.error}
+
+
+OK = DawarichProbeResult()
+
+
+class DawarichProbe:
+    """Check reachability, TLS and authentication of a server concurrently.
+
+    Every check has its own deadline, so a diagnosis is ready within
+    ``PROBE_AUTH_TIMEOUT`` seconds however the server misbehaves. Passed checks
+    are cached for the lifetime of the probe, so the steps of a flow do not
+    check the same host or key twice.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the probe."""
+        self._hass = hass
+        self._passed: set[ProbeKey] = set()
+
+    async def async_probe(
+        self, host: str, use_ssl: bool, verify_ssl: bool, api_key: str | None = None
+    ) -> DawarichProbeResult:
+        """Run the checks that did not pass yet and return the first failure.
+
+        Without an API key only the connection is checked.
+        """
+        url = URL(
+            f"{'https' if use_ssl else 'http'}://"
+            f"{host.removeprefix('http://').removeprefix('https://')}"
+        )
+        checks: dict[ProbeKey, Callable[[], Awaitable[DawarichProbeResult]]] = {
+            (str(url), use_ssl, verify_ssl, None): partial(
+                self._async_check_connection, url, use_ssl, verify_ssl
+            ),
+        }
+        if api_key is not None:
+            checks[str(url), use_ssl, verify_ssl, api_key] = partial(
+                self._async_check_auth, host, use_ssl, verify_ssl, api_key
+            )
+        pending = [key for key in checks if key not in self._passed]
+        results = await asyncio.gather(*(checks[key]() for key in pending))
+        for key, result in zip(pending, results, strict=True):
+            if result.error is None:
+                self._passed.add(key)
+        for result in results:
+            if result.error is not None:
+                _LOGGER.debug("Probe of %s failed: %s", url, result.detail)
+                return result
+        return OK
+
+    async def _async_check_connection(
+        self, url: URL, use_ssl: bool, verify_ssl: bool
+    ) -> DawarichProbeResult:
+        """Open a connection to the server and complete the TLS handshake."""
+        context: ssl.SSLContext | None = None
+        if use_ssl:
+            context = (
+                get_default_context() if verify_ssl else get_default_no_verify_context()
+            )
+        try:
+            async with asyncio.timeout(PROBE_TIMEOUT):
+                _, writer = await asyncio.open_connection(
+                    url.host, url.port, ssl=context
+                )
+        except TimeoutError:
+            return DawarichProbeResult("timeout_connect", detail="Connection timed out")
+        except ssl.SSLCertVerificationError as err:
+            return DawarichProbeResult("invalid_certificate", detail=str(err))
+        except ssl.SSLError as err:
+            return DawarichProbeResult("ssl_error", detail=str(err))
+        except OSError as err:
+            return DawarichProbeResult("cannot_connect", detail=str(err))
+        writer.close()
+        return OK
+
+    async def _async_check_auth(
+        self, host: str, use_ssl: bool, verify_ssl: bool, api_key: str
+    ) -> DawarichProbeResult:
+        """Fetch the stats with the API key."""
+        # A throwaway client, keys that are tried must not keep a pool around.
+        api = get_api(self._hass, host, api_key, use_ssl, verify_ssl, pooled=False)
+        try:
+            async with asyncio.timeout(PROBE_AUTH_TIMEOUT):
+                response = await api.get_stats()
+        except TimeoutError:
+            return DawarichProbeResult(
+                "timeout_connect", detail="The stats request timed out"
+            )
+        match response.response_code:
+            case 200:
+                return OK
+            case 401:
+                return DawarichProbeResult(
+                    "invalid_auth", field=CONF_API_KEY, detail=response.error
+                )
+            case _:
+                return DawarichProbeResult(
+                    "cannot_connect",
+                    detail=f"Status {response.response_code} {response.error}",
+                )
@@ -1,28 +1,40 @@
 """Show statistical data from your Dawarich instance."""
 
 import logging
-from typing import TYPE_CHECKING
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
-from dawarich_api import DawarichAPI
+from dawarich_api.api_calls import AddOnePointResponse
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
     CONF_NAME,
+    EntityCategory,
+    UnitOfInformation,
     UnitOfLength,
+    UnitOfSpeed,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
 )
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_DEVICE, DOMAIN, DawarichTrackerStates
+from .api import DawarichPoint
+from .const import DOMAIN, MONTHS, DawarichTrackerStates
 from .coordinator import DawarichCoordinator
+from .metrics import DawarichClientMetrics, DawarichLatencyHistogram
+from .tracker import DawarichTrackedDevice, DawarichTracker
+from .uploader import DawarichUploader
 
 if TYPE_CHECKING:
     from .config_flow import DawarichConfigFlow
@@ -63,6 +75,192 @@ SENSOR_TYPES = (
     ),
 )
 
+YEAR_SENSOR_TYPES = (
+    SensorEntityDescription(
+        key="total_distance_km",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Distance",
+        icon="mdi:map-marker-distance",
+        device_class=SensorDeviceClass.DISTANCE,
+    ),
+    SensorEntityDescription(
+        key="total_countries_visited",
+        native_unit_of_measurement="countries",
+        name="Countries Visited",
+        icon="mdi:earth",
+    ),
+    SensorEntityDescription(
+        key="total_cities_visited",
+        native_unit_of_measurement="cities",
+        name="Cities Visited",
+        icon="mdi:city",
+    ),
+)
+
+MONTH_SENSOR_TYPE = SensorEntityDescription(
+    key="monthly_distance_km",
+    native_unit_of_measurement=UnitOfLength.KILOMETERS,
+    name="Distance This Month",
+    icon="mdi:calendar-month",
+    device_class=SensorDeviceClass.DISTANCE,
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichTripSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor computed locally from the fixes of a device."""
+
+    value_fn: Callable[[DawarichTrackedDevice], StateType]
+
+
+TRIP_SENSOR_TYPES = (
+    DawarichTripSensorEntityDescription(
+        key="distance_today",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Distance Today",
+        icon="mdi:map-marker-distance",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda device: round(device.trip.distance_today / 1000, 3),
+    ),
+    DawarichTripSensorEntityDescription(
+        key="speed",
+        native_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        name="Speed",
+        icon="mdi:speedometer",
+        device_class=SensorDeviceClass.SPEED,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: None
+        if device.trip.speed is None
+        else round(device.trip.speed, 1),
+    ),
+    DawarichTripSensorEntityDescription(
+        key="movement",
+        name="Movement",
+        icon="mdi:walk",
+        device_class=SensorDeviceClass.ENUM,
+        options=["moving", "stationary"],
+        value_fn=lambda device: "moving" if device.trip.moving else "stationary",
+    ),
+    DawarichTripSensorEntityDescription(
+        key="trip_duration",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        name="Trip Duration",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=lambda device: None
+        if device.trip.trip_duration is None
+        else round(device.trip.trip_duration.total_seconds() / 60, 1),
+    ),
+    DawarichTripSensorEntityDescription(
+        key="zone",
+        name="Zone",
+        icon="mdi:map-marker-radius",
+        value_fn=lambda device: None
+        if device.visit.zone is None
+        else device.visit.zone.name,
+    ),
+    DawarichTripSensorEntityDescription(
+        key="zone_visit_duration",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        name="Zone Visit Duration",
+        icon="mdi:timer-marker-outline",
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=lambda device: None
+        if device.visit.duration is None
+        else round(device.visit.duration.total_seconds() / 60, 1),
+    ),
+)
+
+
+def _latency_ms(histogram: DawarichLatencyHistogram, fraction: float) -> StateType:
+    """Return a latency percentile in milliseconds."""
+    if (seconds := histogram.percentile(fraction)) is None:
+        return None
+    return round(seconds * 1000)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichMetricsSensorEntityDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor of the requests made to Dawarich."""
+
+    value_fn: Callable[[DawarichClientMetrics, DawarichUploader], StateType]
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+
+
+METRICS_SENSOR_TYPES = (
+    DawarichMetricsSensorEntityDescription(
+        key="upload_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        name="Upload Latency",
+        icon="mdi:timer-sand",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics, _: _latency_ms(metrics.uploads.latency, 0.95),
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="upload_errors",
+        native_unit_of_measurement="requests",
+        name="Upload Errors",
+        icon="mdi:upload-off",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics, _: metrics.uploads.errors,
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="upload_timeouts",
+        native_unit_of_measurement="requests",
+        name="Upload Timeouts",
+        icon="mdi:timer-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics, _: metrics.uploads.timeouts,
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="last_upload_status",
+        name="Last Upload Status",
+        icon="mdi:web",
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics, _: metrics.uploads.last_status,
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="bytes_sent",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        name="Bytes Sent",
+        icon="mdi:upload-network",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics, _: metrics.uploads.bytes_sent,
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="upload_queue",
+        native_unit_of_measurement="points",
+        name="Upload Queue",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda _, uploader: uploader.queue_depth,
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="stats_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        name="Statistics Latency",
+        icon="mdi:timer-sand",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics, _: _latency_ms(metrics.stats.latency, 0.95),
+    ),
+    DawarichMetricsSensorEntityDescription(
+        key="stats_errors",
+        native_unit_of_measurement="requests",
+        name="Statistics Errors",
+        icon="mdi:cloud-alert",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics, _: metrics.stats.errors,
+    ),
+)
+
 TRACKER_SENSOR_TYPES = SensorEntityDescription(
     key="last_update",
     name="Last Update",
@@ -89,30 +287,85 @@ async def async_setup_entry(
         configuration_url=entry.runtime_data.api.url,
     )
 
-    sensors: list[DawarichTrackerSensor | DawarichStatisticsSensor] = [
+    sensors: list[SensorEntity] = [
         DawarichStatisticsSensor(url, api_key, name, desc, coordinator, device_info)
         for desc in SENSOR_TYPES
     ]
+    sensors.append(
+        DawarichMonthSensor(
+            url, api_key, name, MONTH_SENSOR_TYPE, coordinator, device_info
+        )
+    )
+
+    sensors.extend(
+        DawarichMetricsSensor(
+            api_key,
+            name,
+            entry.runtime_data.api.metrics,
+            entry.runtime_data.uploader,
+            device_info,
+            desc,
+        )
+        for desc in METRICS_SENSOR_TYPES
+    )
+
+    for target_id, mirror in entry.runtime_data.mirrors.items():
+        target = hass.config_entries.async_get_entry(target_id)
+        sensors.append(
+            DawarichMirrorSensor(
+                api_key,
+                name,
+                target_id,
+                target.title if target is not None else target_id,
+                mirror,
+                device_info,
+            )
+        )
+
+    known_years: set[int] = set()
 
-    mobile_app = entry.data[CONF_DEVICE]
-    if mobile_app is not None:
+    @callback
+    def _async_add_year_sensors() -> None:
+        """Add the sensors of the current year once it appears in the stats."""
+        year = dt_util.now().year
+        if year in known_years or year not in coordinator.periods:
+            return
+        known_years.add(year)
+        async_add_entities(
+            DawarichYearSensor(url, api_key, name, desc, coordinator, device_info, year)
+            for desc in YEAR_SENSOR_TYPES
+        )
+
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_year_sensors))
+
+    tracker = entry.runtime_data.tracker
+    for mobile_app, device in tracker.devices.items():
         _LOGGER.info("Adding tracker sensor for %s", mobile_app)
-        api = entry.runtime_data.api
+        device_name = (
+            name if len(tracker.devices) == 1 else f"{name} {device.device_id}"
+        )
         sensors.append(
             DawarichTrackerSensor(
                 api_key=api_key,
-                device_name=name,
+                device_name=device_name,
                 mobile_app=mobile_app,
-                api=api,
+                tracker=tracker,
                 hass=hass,
                 device_info=device_info,
                 description=TRACKER_SENSOR_TYPES,
             )
         )
-    else:
+        sensors.extend(
+            DawarichTripSensor(
+                api_key, device_name, mobile_app, tracker, device_info, desc
+            )
+            for desc in TRIP_SENSOR_TYPES
+        )
+    if not tracker.devices:
         _LOGGER.info("No mobile device provided, skipping tracker sensor")
 
     async_add_entities(sensors)
+    _async_add_year_sensors()
 
 
 class DawarichTrackerSensor(SensorEntity):
@@ -123,7 +376,7 @@ class DawarichTrackerSensor(SensorEntity):
         api_key: str,
         device_name: str,
         mobile_app,
-        api: DawarichAPI,
+        tracker: DawarichTracker,
         hass: HomeAssistant,
         device_info: DeviceInfo,
         description: SensorEntityDescription,
@@ -133,22 +386,23 @@ class DawarichTrackerSensor(SensorEntity):
         self._mobile_app = mobile_app
         self._api_key = api_key
         self._hass = hass
-        self._api = api
+        self._tracker = tracker
         self._attr_device_info = device_info
         self._attr_device_class = description.device_class
 
-        self._async_unsubscribe_state_changed = async_track_state_change_event(
-            hass=self._hass,
-            entity_ids=[self._mobile_app],
-            action=self._async_update_callback,
-        )
         self._state: DawarichTrackerStates = DawarichTrackerStates.UNKNOWN
         self._attr_options = [state.value for state in DawarichTrackerStates]
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the upload results of the tracked device."""
+        self.async_on_remove(
+            self._tracker.async_add_listener(self._mobile_app, self._async_handle_flush)
+        )
+
     @property
     def unique_id(self) -> str:  # type: ignore[override]
         """Return a unique id for the sensor."""
-        return f"{self._api_key}/tracker"
+        return f"{self._api_key}/tracker/{self._mobile_app}"
 
     @property
     def state(self) -> StateType:
@@ -160,64 +414,27 @@ class DawarichTrackerSensor(SensorEntity):
         """Return the icon to use in the frontend."""
         return "mdi:map-marker-circle"
 
-    async def _async_update_callback(self, event):
-        """Update the Dawarich API with the new location."""
-        _LOGGER.debug(
-            "State change detected for %s, updating Dawarich", self._mobile_app
-        )
-        if (new_state := event.data.get("new_state")) is None:
-            _LOGGER.error("No new state found for %s", self._mobile_app)
-            return
-
-        # Log received data
-        new_data = new_state.attributes
-        _LOGGER.debug("Received data: %s", new_data)
-
-        # Get coordinates from new_data
-        latitude = new_data.get("latitude")
-        longitude = new_data.get("longitude")
-
-        # Check if the coordinates are present
-        if latitude is None or longitude is None:
-            _LOGGER.debug("Coordinates are not present, skipping update")
-            return
-
-        # Only include optional parameters if they have valid values
-        optional_params = {}
-
-        if (gps_accuracy := new_data.get("gps_accuracy")) is not None:
-            optional_params["horizontal_accuracy"] = gps_accuracy
-
-        if (altitude := new_data.get("altitude")) is not None:
-            optional_params["altitude"] = altitude
-
-        if (vertical_accuracy := new_data.get("vertical_accuracy")) is not None:
-            optional_params["vertical_accuracy"] = vertical_accuracy
-
-        if (speed := new_data.get("speed")) is not None:
-            # Convert speed from m/s to km/h
-            optional_params["speed"] = speed
-
-        if (battery := new_data.get("battery")) is not None:
-            optional_params["battery"] = battery
-
-        # Send to Dawarich API
-        response = await self._api.add_one_point(
-            name=self._device_name,
-            latitude=latitude,
-            longitude=longitude,
-            **optional_params,
-        )
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the upload queue statistics."""
+        uploader = self._tracker.uploader
+        latency = uploader.last_flush_latency
+        return {
+            "queue_depth": uploader.queue_depth,
+            "flush_latency_ms": None if latency is None else round(latency * 1000),
+        }
+
+    @callback
+    def _async_handle_flush(
+        self, points: Sequence[DawarichPoint], response: AddOnePointResponse
+    ) -> None:
+        """Update the state with the result of an upload batch."""
         if response.success:
             _LOGGER.debug("Location sent to Dawarich API")
             self._state = DawarichTrackerStates.SUCCESS
         else:
             self._state = DawarichTrackerStates.ERROR
-            _LOGGER.error(
-                "Error sending location to Dawarich API response code %s and error: %s",
-                response.response_code,
-                response.error,
-            )
+        self.async_write_ha_state()
 
     @property
     def name(self) -> str:  # type: ignore[override]
@@ -230,6 +447,118 @@ class DawarichTrackerSensor(SensorEntity):
         return TRACKER_SENSOR_TYPES.native_unit_of_measurement
 
 
+class DawarichTripSensor(SensorEntity):
+    """Sensor with live trip statistics of a tracked device."""
+
+    entity_description: DawarichTripSensorEntityDescription
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        api_key: str,
+        device_name: str,
+        mobile_app: str,
+        tracker: DawarichTracker,
+        device_info: DeviceInfo,
+        description: DawarichTripSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._mobile_app = mobile_app
+        self._tracker = tracker
+        self._device = tracker.devices[mobile_app]
+        self.entity_description = description
+        self._attr_unique_id = f"{api_key}/trip/{mobile_app}/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the fixes of the tracked device."""
+        self.async_on_remove(
+            self._tracker.async_add_fix_listener(
+                self._mobile_app, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._device)
+
+
+class DawarichMetricsSensor(SensorEntity):
+    """Diagnostic sensor with metrics of the requests made to Dawarich.
+
+    The metrics change with every request, so the sensor is polled instead of
+    writing its state from the request path.
+    """
+
+    entity_description: DawarichMetricsSensorEntityDescription
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        api_key: str,
+        device_name: str,
+        metrics: DawarichClientMetrics,
+        uploader: DawarichUploader,
+        device_info: DeviceInfo,
+        description: DawarichMetricsSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._uploader = uploader
+        self.entity_description = description
+        self._attr_unique_id = f"{api_key}/metrics/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._metrics, self._uploader)
+
+
+class DawarichMirrorSensor(SensorEntity):
+    """Diagnostic sensor with the health of the uploads to a mirror server."""
+
+    _attr_should_poll = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = ["healthy", "retrying"]
+    _attr_icon = "mdi:server-network"
+
+    def __init__(
+        self,
+        api_key: str,
+        device_name: str,
+        target_id: str,
+        target_name: str,
+        uploader: DawarichUploader,
+        device_info: DeviceInfo,
+    ) -> None:
+        """Initialize the sensor."""
+        self._uploader = uploader
+        self._attr_unique_id = f"{api_key}/mirror/{target_id}"
+        self._attr_name = f"{device_name} Mirror {target_name}"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return whether uploads to the mirror succeed."""
+        return "healthy" if self._uploader.healthy else "retrying"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the queue and throughput of the mirror."""
+        throughput = self._uploader.throughput
+        return {
+            "queue_depth": self._uploader.queue_depth,
+            "uploaded": self._uploader.uploaded,
+            "points_per_second": None if throughput is None else round(throughput, 1),
+            "last_success": self._uploader.last_success,
+        }
+
+
 class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore[incompatible-subclass]
     """Representation fo a Dawarich sensor."""
 
@@ -251,6 +580,28 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
         self._attr_unique_id = api_key + "/" + description.key
         self._attr_device_info = device_info
         self._attr_state_class = SensorStateClass.TOTAL
+        self._update_key = description.key
+        self._written_available: bool | None = None
+        self._written_stale: bool | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write the state when this sensor's value changed."""
+        if (
+            self._written_available == self.available
+            and self._written_stale == self.coordinator.stale
+            and not self._value_changed()
+        ):
+            self.coordinator.skipped_updates[self._update_key] += 1
+            return
+        self.coordinator.propagated_updates[self._update_key] += 1
+        self._written_available = self.available
+        self._written_stale = self.coordinator.stale
+        super()._handle_coordinator_update()
+
+    def _value_changed(self) -> bool:
+        """Return whether the last refresh changed the value of this sensor."""
+        return self.entity_description.key in self.coordinator.changed_keys
 
     @property
     def native_value(self) -> StateType:  # type: ignore[override]
@@ -259,6 +610,11 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
             return None
         return self.coordinator.data[self.entity_description.key]
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return whether the value comes from stats that could not be refreshed."""
+        return {"stale": self.coordinator.stale}
+
     @property
     def icon(self) -> str:  # type: ignore[override]
         """Return the icon to use in the frontend."""
@@ -273,3 +629,97 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
             return f"{self._device_name} {self.entity_description.name.title()}"
         _LOGGER.error("Name is not a string for %s", self.entity_description.key)
         return f"{self._device_name}"
+
+
+class DawarichYearSensor(DawarichStatisticsSensor):
+    """Statistics of a single year."""
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        device_name: str,
+        description: SensorEntityDescription,
+        coordinator: DawarichCoordinator,
+        device_info: DeviceInfo,
+        year: int,
+    ):
+        """Initialize Dawarich year sensor."""
+        super().__init__(
+            url, api_key, device_name, description, coordinator, device_info
+        )
+        self._year = year
+        self._attr_unique_id = f"{api_key}/{year}/{description.key}"
+        self._update_key = f"{year}/{description.key}"
+
+    def _value_changed(self) -> bool:
+        """Return whether the last refresh changed the stats of this year."""
+        return self._year in self.coordinator.changed_periods
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the device."""
+        if (year_stats := self.coordinator.periods.get(self._year)) is None:
+            return None
+        return year_stats[self.entity_description.key]
+
+    @property
+    def name(self) -> str:  # type: ignore[override]
+        """Return the name of the sensor."""
+        return f"{super().name} {self._year}"
+
+
+class DawarichMonthSensor(DawarichStatisticsSensor):
+    """Distance travelled in the current month."""
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        device_name: str,
+        description: SensorEntityDescription,
+        coordinator: DawarichCoordinator,
+        device_info: DeviceInfo,
+    ):
+        """Initialize Dawarich month sensor."""
+        super().__init__(
+            url, api_key, device_name, description, coordinator, device_info
+        )
+        self._written_month: tuple[int, int] | None = None
+
+    def _value_changed(self) -> bool:
+        """Return whether the month rolled over or its year's stats changed."""
+        now = dt_util.now()
+        if self._written_month != (now.year, now.month):
+            self._written_month = (now.year, now.month)
+            return True
+        return now.year in self.coordinator.changed_periods
+
+    async def async_added_to_hass(self) -> None:
+        """Rewrite the state when a new month starts, even without new stats."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        """Switch to the new month at its first midnight."""
+        if self._written_month != (now.year, now.month):
+            self._written_month = (now.year, now.month)
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the device."""
+        now = dt_util.now()
+        if (year_stats := self.coordinator.periods.get(now.year)) is None:
+            return None
+        return year_stats[self.entity_description.key].get(MONTHS[now.month - 1])
+
+    @property
+    def last_reset(self) -> datetime:  # type: ignore[override]
+        """Return the start of the current month."""
+        return dt_util.start_of_local_day().replace(day=1)
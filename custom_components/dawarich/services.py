@@ -0,0 +1,94 @@
+"""Services for the Dawarich integration."""
+
+from datetime import datetime
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID, ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+SERVICE_BACKFILL = "backfill"
+ATTR_START_TIME = "start_time"
+ATTR_END_TIME = "end_time"
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(ATTR_START_TIME): cv.datetime,
+        vol.Optional(ATTR_END_TIME): cv.datetime,
+    }
+)
+
+
+def _as_aware(value: datetime) -> datetime:
+    """Interpret naive datetimes in the local time zone."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+    return value
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Dawarich services."""
+
+    async def _async_backfill(call: ServiceCall) -> None:
+        """Start uploading recorded device_tracker history to Dawarich."""
+        entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+        if (
+            entry is None
+            or entry.domain != DOMAIN
+            or entry.state is not ConfigEntryState.LOADED
+        ):
+            raise ServiceValidationError("Dawarich config entry is not loaded")
+        if "recorder" not in hass.config.components:
+            raise ServiceValidationError("The recorder integration is not set up")
+
+        start = _as_aware(call.data[ATTR_START_TIME])
+        end = _as_aware(call.data.get(ATTR_END_TIME) or dt_util.now())
+        if start >= end:
+            raise ServiceValidationError("The start time must be before the end time")
+
+        tracked = entry.runtime_data.tracker.devices
+        entity_ids = call.data.get(ATTR_ENTITY_ID) or list(tracked)
+        if not entity_ids:
+            raise ServiceValidationError("No device_tracker to backfill")
+        devices = {
+            entity_id: tracked[entity_id].device_id
+            if entity_id in tracked
+            else entity_id.split(".", 1)[1]
+            for entity_id in entity_ids
+        }
+
+        # The recorder is only imported once a backfill is requested.
+        from .backfill import DawarichBackfill  # noqa: PLC0415
+
+        runtime_data = entry.runtime_data
+        backfill = DawarichBackfill(
+            hass,
+            (runtime_data.uploader, *runtime_data.mirrors.values()),
+            entry.entry_id,
+            entry.options,
+            runtime_data.backfill_lock,
+        )
+
+        async def _async_run() -> None:
+            await backfill.async_run(
+                devices, dt_util.as_utc(start), dt_util.as_utc(end)
+            )
+            if (importer := runtime_data.statistics) is not None:
+                # Import the backfilled months again once their stats change.
+                await importer.async_rewind(start)
+
+        entry.async_create_background_task(
+            hass, _async_run(), f"dawarich backfill {entry.entry_id}"
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, _async_backfill, schema=BACKFILL_SCHEMA
+    )
@@ -0,0 +1,131 @@
+"""Import the monthly distances of Dawarich into long-term statistics."""
+
+import asyncio
+import logging
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.const import UnitOfLength
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, MONTHS
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def statistic_id(entry_id: str) -> str:
+    """Return the id of the distance statistic of a config entry."""
+    return f"{DOMAIN}:distance_{entry_id.lower()}"
+
+
+def _month_start(year: int, month: int) -> datetime:
+    """Return the start of a month in the local time zone."""
+    return datetime(year, month, 1, tzinfo=dt_util.get_default_time_zone())
+
+
+class DawarichStatisticsImporter:
+    """Write the distance of every month into an external statistic.
+
+    Dawarich only reports distances per month, so the statistic has one row
+    per month, with the distance of the month as its state and the running
+    total as its sum. Every finished month is imported once: the last one and
+    the sum up to it are stored as a high-water mark, and a run only imports
+    the months after it, all in a single batch. The current month is written
+    again on every run until it is over. A backfill rewinds the mark to before
+    the first month it changed, and the sum up to it is then added up again.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, name: str) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        self._store = Store[dict[str, Any]](
+            hass, STORAGE_VERSION, f"{DOMAIN}.statistics.{entry_id}"
+        )
+        self._lock = asyncio.Lock()
+        self.statistic_id = statistic_id(entry_id)
+        self._metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{name} Distance",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement=UnitOfLength.KILOMETERS,
+        )
+
+    async def async_import(self, periods: Mapping[int, Mapping[str, Any]]) -> None:
+        """Import the months of the yearly stats after the high-water mark."""
+        async with self._lock:
+            mark = await self._store.async_load() or {}
+            done = mark.get("month")
+            # A rewound mark has no sum, the months up to it are added up again.
+            rewound = "sum" not in mark
+            total = mark.get("sum", 0.0)
+            now = dt_util.now()
+            current = (now.year, now.month)
+
+            statistics = []
+            for year in sorted(periods):
+                distances = periods[year].get("monthly_distance_km") or {}
+                for month, key in enumerate(MONTHS, start=1):
+                    if (year, month) > current:
+                        break
+                    distance = float(distances.get(key) or 0)
+                    if done is not None and (year, month) <= tuple(done):
+                        if rewound:
+                            total += distance
+                        continue
+                    statistics.append(
+                        StatisticData(
+                            start=_month_start(year, month),
+                            state=distance,
+                            sum=total + distance,
+                        )
+                    )
+                    if (year, month) < current:
+                        total += distance
+                        done = (year, month)
+
+            if not statistics:
+                return
+            async_add_external_statistics(self._hass, self._metadata, statistics)
+            _LOGGER.debug(
+                "Imported %s months into %s", len(statistics), self.statistic_id
+            )
+            if done is not None:
+                await self._store.async_save({"month": list(done), "sum": total})
+
+    async def async_rewind(self, start: datetime) -> None:
+        """Import the months from the one of ``start`` on again.
+
+        Called after history was backfilled, which changes the distance of its
+        months and the sum of every month after them.
+        """
+        start = dt_util.as_local(start)
+        async with self._lock:
+            mark = await self._store.async_load() or {}
+            if (done := mark.get("month")) is None or tuple(done) < (
+                start.year,
+                start.month,
+            ):
+                return
+            if start.month > 1:
+                previous = (start.year, start.month - 1)
+            else:
+                previous = (start.year - 1, 12)
+            # Without a sum, the next import adds up the months up to the mark.
+            await self._store.async_save({"month": list(previous)})
+
+    async def async_remove(self) -> None:
+        """Delete the imported statistic and forget the high-water mark."""
+        get_instance(self._hass).async_clear_statistics([self.statistic_id])
+        await self._store.async_remove()
@@ -0,0 +1,407 @@
+"""Forward device_tracker locations to Dawarich."""
+
+import logging
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import Any
+
+from dawarich_api.api_calls import AddOnePointResponse
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.util import dt as dt_util
+
+from .api import DawarichPoint
+from .const import (
+    CONF_MAX_ACCURACY,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MOBILE_APP_STREAM,
+    CONF_QUEUE_MODE,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MOBILE_APP_STREAM,
+    DEFAULT_QUEUE_MODE,
+    EVENT_ZONE_ENTERED,
+    EVENT_ZONE_LEFT,
+    QUEUE_MODE_LATEST,
+    SIGNAL_MOBILE_APP_LOCATION_UPDATE,
+)
+from .filters import DawarichPointFilter
+from .pipeline import DawarichPointPipeline
+from .trip import DawarichTripEngine
+from .uploader import DawarichUploader, is_retryable
+from .zones import DawarichZone, DawarichZoneIndex, DawarichZoneVisit
+
+_LOGGER = logging.getLogger(__name__)
+
+type DeviceListener = Callable[[Sequence[DawarichPoint], AddOnePointResponse], None]
+
+
+@dataclass(slots=True)
+class DawarichTrackedDevice:
+    """A device_tracker entity whose locations are sent to Dawarich."""
+
+    entity_id: str
+    device_id: str
+    point_filter: DawarichPointFilter
+    pipeline: DawarichPointPipeline
+    trip: DawarichTripEngine = field(default_factory=DawarichTripEngine)
+    visit: DawarichZoneVisit = field(default_factory=DawarichZoneVisit)
+    listeners: list[DeviceListener] = field(default_factory=list)
+    fix_listeners: list[CALLBACK_TYPE] = field(default_factory=list)
+    in_flight: int = 0
+    held: DawarichPoint | None = None
+    coalesced: int = 0
+
+
+@callback
+def _is_zone_change(event_data: EventStateChangedData) -> bool:
+    """Return whether a state change is one of a zone."""
+    return event_data["entity_id"].startswith("zone.")
+
+
+class DawarichTracker:
+    """Feed the locations of several device_trackers into one uploader.
+
+    All devices share a single state change subscription and a single upload
+    queue. Upload results are dispatched back to the listeners of the devices
+    whose points were in the batch.
+
+    Points are also fanned out to the ``mirrors``, uploaders of other Dawarich
+    servers. Each has its own outbox, retries and health, so a slow or dead
+    mirror does not hold up the other uploads.
+
+    With the ``mobile_app_stream`` option, trackers of the mobile_app
+    integration are fed from its raw location updates instead, before they are
+    throttled into states and written to the recorder.
+
+    Every fix is tagged with the zone it is in, looked up in a grid index that
+    follows the zone states. Entering and leaving a zone fires an event.
+
+    In the ``queue`` mode every accepted point goes to the durable outbox. In
+    the ``latest`` mode at most ``max_in_flight`` points of a device wait in
+    the outbox; newer fixes are held back, each replacing the one held before,
+    and the newest is queued once an upload made room. Either way points of a
+    device are uploaded in the order they were taken.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        uploader: DawarichUploader,
+        devices: Mapping[str, str],
+        options: Mapping[str, Any],
+        mirrors: Mapping[str, DawarichUploader] | None = None,
+    ) -> None:
+        """Initialize the tracker with a map of entity ids to Dawarich device ids."""
+        self._hass = hass
+        self.uploader = uploader
+        self.mirrors = dict(mirrors or {})
+        self.zones = DawarichZoneIndex()
+        self.devices = {
+            entity_id: DawarichTrackedDevice(
+                entity_id=entity_id,
+                device_id=device_id,
+                point_filter=DawarichPointFilter.from_options(options),
+                pipeline=DawarichPointPipeline.from_options(options, entity_id),
+            )
+            for entity_id, device_id in devices.items()
+        }
+        self._by_device_id = {
+            device.device_id: device for device in self.devices.values()
+        }
+        self._latest_wins = (
+            options.get(CONF_QUEUE_MODE, DEFAULT_QUEUE_MODE) == QUEUE_MODE_LATEST
+        )
+        self._max_in_flight = options.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT)
+        self._stream = options.get(CONF_MOBILE_APP_STREAM, DEFAULT_MOBILE_APP_STREAM)
+        self._unsubscribers: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Subscribe to the tracked entities and to upload results."""
+        if not self.devices:
+            return
+        for state in self._hass.states.async_all("zone"):
+            self.zones.update(state.entity_id, state)
+        self._unsubscribers.append(
+            self._hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_zone_changed,
+                event_filter=_is_zone_change,
+            )
+        )
+        followed = list(self.devices)
+        if self._stream:
+            registry = er.async_get(self._hass)
+            for device in self.devices.values():
+                if (
+                    (entity := registry.async_get(device.entity_id)) is None
+                    or entity.platform != "mobile_app"
+                    or entity.config_entry_id is None
+                ):
+                    continue
+                _LOGGER.debug("Streaming the locations of %s", device.entity_id)
+                followed.remove(device.entity_id)
+                self._unsubscribers.append(
+                    async_dispatcher_connect(
+                        self._hass,
+                        SIGNAL_MOBILE_APP_LOCATION_UPDATE.format(
+                            entity.config_entry_id
+                        ),
+                        partial(self._async_location_update, device),
+                    )
+                )
+        if followed:
+            self._unsubscribers.append(
+                async_track_state_change_event(
+                    self._hass, followed, self._async_state_changed
+                )
+            )
+        self._unsubscribers.append(
+            self.uploader.async_add_listener(self._async_flushed)
+        )
+        self._unsubscribers.append(
+            self.uploader.async_add_duplicate_listener(self._async_duplicates)
+        )
+        self._unsubscribers.append(
+            async_track_time_change(
+                self._hass, self._async_new_day, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe and queue the points held back by the filters."""
+        while self._unsubscribers:
+            self._unsubscribers.pop()()
+        for device in self.devices.values():
+            if device.held is not None:
+                self._async_enqueue(device.held)
+                device.held = None
+            for point in device.point_filter.flush():
+                self._async_enqueue(point)
+
+    @callback
+    def async_update_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed filter options to the tracked devices."""
+        max_accuracy = options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY)
+        for device in self.devices.values():
+            device.point_filter.max_accuracy = max_accuracy
+
+    @callback
+    def async_add_listener(
+        self, entity_id: str, listener: DeviceListener
+    ) -> CALLBACK_TYPE:
+        """Register a listener for the upload results of one device."""
+        listeners = self.devices[entity_id].listeners
+        listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_add_fix_listener(
+        self, entity_id: str, listener: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Register a listener called after each new fix of one device."""
+        listeners = self.devices[entity_id].fix_listeners
+        listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Queue the new location of a tracked entity for upload."""
+        entity_id = event.data["entity_id"]
+        _LOGGER.debug("State change detected for %s, updating Dawarich", entity_id)
+        if (new_state := event.data.get("new_state")) is None:
+            _LOGGER.error("No new state found for %s", entity_id)
+            return
+
+        # Log received data
+        _LOGGER.debug("Received data: %s", new_state.attributes)
+
+        device = self.devices[entity_id]
+        if (
+            point := device.pipeline(
+                device.device_id, new_state, new_state.last_updated
+            )
+        ) is None:
+            _LOGGER.debug("Coordinates are not present, skipping update")
+            return
+        self._async_process(device, point)
+
+    @callback
+    def _async_location_update(
+        self, device: DawarichTrackedDevice, data: Mapping[str, Any]
+    ) -> None:
+        """Queue a location reported to the mobile_app webhook for upload.
+
+        The update carries no time of its own, so it is stamped on arrival.
+        """
+        if not (gps := data.get("gps")):
+            _LOGGER.debug("No location in the update of %s", device.entity_id)
+            return
+        attributes = {
+            "latitude": gps[0],
+            "longitude": gps[1],
+            "gps_accuracy": data.get("gps_accuracy"),
+            "battery_level": data.get("battery"),
+            "altitude": data.get("altitude"),
+            "vertical_accuracy": data.get("vertical_accuracy"),
+            "speed": data.get("speed"),
+            "course": data.get("course"),
+        }
+        if (
+            point := device.pipeline.from_attributes(
+                device.device_id, attributes, dt_util.now()
+            )
+        ) is not None:
+            self._async_process(device, point)
+
+    @callback
+    def _async_process(
+        self, device: DawarichTrackedDevice, point: DawarichPoint
+    ) -> None:
+        """Tag, follow, filter and queue a new fix of a device."""
+        zone = self.zones.query(
+            point.latitude, point.longitude, point.horizontal_accuracy or 0
+        )
+        point.zone = None if zone is None else zone.name
+        self._async_update_visit(device, zone, point.timestamp)
+
+        device.trip.add_fix(point)
+        for listener in list(device.fix_listeners):
+            listener()
+
+        for accepted in device.point_filter.process(point):
+            self._async_submit(device, accepted)
+
+    @callback
+    def _async_new_day(self, now: datetime) -> None:
+        """Reset the daily distances at midnight, also of devices without fixes."""
+        for device in self.devices.values():
+            if device.trip.start_day(now.date()):
+                for listener in list(device.fix_listeners):
+                    listener()
+
+    @callback
+    def _async_zone_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Reindex a zone that was added, changed or removed."""
+        self.zones.update(event.data["entity_id"], event.data["new_state"])
+
+    @callback
+    def _async_update_visit(
+        self,
+        device: DawarichTrackedDevice,
+        zone: DawarichZone | None,
+        timestamp: datetime,
+    ) -> None:
+        """Follow the zone a device is in and fire events when it changes."""
+        visit = device.visit
+        first_fix = visit.last_fix is None
+        visit.last_fix = timestamp
+        if (None if visit.zone is None else visit.zone.entity_id) == (
+            None if zone is None else zone.entity_id
+        ):
+            visit.zone = zone
+            return
+        if visit.zone is not None and not first_fix:
+            self._hass.bus.async_fire(
+                EVENT_ZONE_LEFT,
+                {
+                    "entity_id": device.entity_id,
+                    "device_id": device.device_id,
+                    "zone": visit.zone.entity_id,
+                    "zone_name": visit.zone.name,
+                    "duration": (timestamp - visit.since).total_seconds()
+                    if visit.since is not None
+                    else None,
+                },
+            )
+        visit.zone = zone
+        visit.since = None if zone is None else timestamp
+        if zone is not None and not first_fix:
+            self._hass.bus.async_fire(
+                EVENT_ZONE_ENTERED,
+                {
+                    "entity_id": device.entity_id,
+                    "device_id": device.device_id,
+                    "zone": zone.entity_id,
+                    "zone_name": zone.name,
+                },
+            )
+
+    @callback
+    def _async_submit(
+        self, device: DawarichTrackedDevice, point: DawarichPoint
+    ) -> None:
+        """Queue a point, or hold it back while the window of its device is full."""
+        if self._latest_wins and device.in_flight >= self._max_in_flight:
+            if device.held is not None:
+                device.coalesced += 1
+            device.held = point
+            return
+        if self._async_enqueue(point):
+            device.in_flight += 1
+
+    @callback
+    def _async_enqueue(self, point: DawarichPoint) -> bool:
+        """Queue a point for upload to the server and every mirror.
+
+        Return whether the uploader of the server queued it.
+        """
+        for mirror in self.mirrors.values():
+            mirror.async_enqueue(point)
+        return self.uploader.async_enqueue(point)
+
+    @callback
+    def _async_release(self, device: DawarichTrackedDevice, count: int) -> None:
+        """Free room in the window of a device and queue the point it held back."""
+        device.in_flight = max(device.in_flight - count, 0)
+        if device.held is not None and device.in_flight < self._max_in_flight:
+            held, device.held = device.held, None
+            self._async_submit(device, held)
+
+    @callback
+    def _async_duplicates(self, points: Sequence[DawarichPoint]) -> None:
+        """Free the room taken by points the outbox already held."""
+        for point in points:
+            if (device := self._by_device_id.get(point.device_id)) is not None:
+                self._async_release(device, 1)
+
+    @callback
+    def _async_flushed(
+        self, points: Sequence[DawarichPoint], response: AddOnePointResponse
+    ) -> None:
+        """Dispatch an upload result to the devices that were in the batch."""
+        device_ids = {point.device_id for point in points}
+        for device_id in device_ids:
+            if (device := self._by_device_id.get(device_id)) is None:
+                continue
+            device_points = [point for point in points if point.device_id == device_id]
+            if not is_retryable(response):
+                self._async_release(device, len(device_points))
+            for listener in list(device.listeners):
+                listener(device_points, response)
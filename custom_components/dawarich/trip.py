@@ -0,0 +1,101 @@
+"""Live trip statistics computed from the fixes sent to Dawarich."""
+
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .api import DawarichPoint
+from .buffer import DawarichFixBuffer
+from .helpers import haversine
+
+TRIP_WINDOW = 32
+SPEED_WINDOW = timedelta(minutes=2)
+MOVING_SPEED_KMH = 3.0
+TRIP_END_AFTER = timedelta(minutes=5)
+
+
+class DawarichTripEngine:
+    """Keep live movement statistics for one device.
+
+    The most recent fixes are kept in a columnar ``DawarichFixBuffer``, and the
+    speed is computed over views of its columns. Distances are only accumulated
+    once a fix moved further from the last counted one than its reported
+    accuracy, so stationary GPS jitter does not add up. Fixes within the
+    accuracy are buffered at the position of the last counted one, so the
+    jitter does not count towards the speed either.
+    """
+
+    def __init__(self, window: int = TRIP_WINDOW) -> None:
+        """Initialize the engine."""
+        self.fixes = DawarichFixBuffer(window)
+        self._anchor: tuple[float, float] | None = None
+        self._day: date | None = None
+        self.distance_today = 0.0
+        self.speed: float | None = None
+        self.moving = False
+        self.trip_start: datetime | None = None
+        self.last_moving: datetime | None = None
+
+    @property
+    def trip_duration(self) -> timedelta | None:
+        """Return the duration of the current or last trip."""
+        if self.trip_start is None or self.last_moving is None:
+            return None
+        return self.last_moving - self.trip_start
+
+    def start_day(self, day: date) -> bool:
+        """Reset the distance of the day once a new day started.
+
+        Return whether the day changed.
+        """
+        if day == self._day:
+            return False
+        self._day = day
+        self.distance_today = 0.0
+        return True
+
+    def add_fix(self, point: DawarichPoint) -> None:
+        """Update the statistics with a new fix."""
+        timestamp = point.timestamp
+        self.start_day(dt_util.as_local(timestamp).date())
+
+        if self._anchor is None:
+            self._anchor = (point.latitude, point.longitude)
+        else:
+            moved = haversine(*self._anchor, point.latitude, point.longitude)
+            if moved > (point.horizontal_accuracy or 0):
+                self.distance_today += moved
+                self._anchor = (point.latitude, point.longitude)
+            else:
+                point = replace(
+                    point, latitude=self._anchor[0], longitude=self._anchor[1]
+                )
+
+        self.fixes.append(point)
+        self.speed = self._window_speed()
+        if self.speed is None and point.speed is not None and point.speed >= 0:
+            self.speed = point.speed * 3.6
+
+        self.moving = self.speed is not None and self.speed >= MOVING_SPEED_KMH
+        if self.moving:
+            if (
+                self.last_moving is None
+                or timestamp - self.last_moving > TRIP_END_AFTER
+            ):
+                self.trip_start = timestamp
+            self.last_moving = timestamp
+
+    def _window_speed(self) -> float | None:
+        """Return the average speed in km/h over the recent fixes."""
+        timestamps = self.fixes.column("timestamp")
+        latest = timestamps[-1]
+        first = len(timestamps) - 1
+        while (
+            first > 0 and latest - timestamps[first - 1] <= SPEED_WINDOW.total_seconds()
+        ):
+            first -= 1
+        if (start := timestamps[first]) == latest:
+            return None
+        distance = sum(self.fixes.distances(len(timestamps) - first))
+        return distance / (latest - start) * 3.6
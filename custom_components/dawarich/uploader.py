@@ -0,0 +1,334 @@
+"""Buffered point uploads for the Dawarich integration."""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+from dawarich_api.api_calls import AddOnePointResponse
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .api import DawarichClient, DawarichPoint
+from .const import (
+    UPLOAD_BATCH_SIZE,
+    UPLOAD_FLUSH_INTERVAL,
+    UPLOAD_RETRY_INTERVAL,
+    UPLOAD_RETRY_MAX_INTERVAL,
+)
+from .outbox import DawarichOutbox
+
+_LOGGER = logging.getLogger(__name__)
+
+type FlushListener = Callable[[Sequence[DawarichPoint], AddOnePointResponse], None]
+type DuplicateListener = Callable[[Sequence[DawarichPoint]], None]
+
+# Response codes that mean the batch may succeed if sent again later.
+RETRYABLE_STATUS_CODES = {401, 403, 408, 429}
+
+# Number of recent batches the upload throughput is averaged over.
+THROUGHPUT_WINDOW = 32
+
+# Number of recently queued fixes that are remembered to drop duplicates.
+DEDUPE_WINDOW = 1024
+
+
+def is_retryable(response: AddOnePointResponse) -> bool:
+    """Return whether a failed batch stays in the outbox to be sent again."""
+    return not response.success and (
+        response.response_code in RETRYABLE_STATUS_CODES
+        or response.response_code >= 500
+    )
+
+
+class DawarichUploader:
+    """Upload points to Dawarich in batches through a durable outbox.
+
+    Every point is appended to the outbox before anything is sent. A drain of
+    the outbox starts as soon as ``batch_size`` points are waiting, or when the
+    oldest one has waited ``flush_interval``, whichever comes first. Points are
+    only removed from the outbox once Dawarich has accepted them; failed
+    batches are retried with exponential backoff.
+
+    Fixes are identified by their device and timestamp. A fix queued again
+    within the last ``DEDUPE_WINDOW`` fixes, or while it is still waiting in
+    the outbox, is dropped, so replaying points never uploads them twice. The
+    outbox is only checked when the points are written, so points it already
+    held are passed to the duplicate listeners.
+    Every batch is sent in the order the fixes were taken.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichClient,
+        outbox: DawarichOutbox,
+        *,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        flush_interval: timedelta = UPLOAD_FLUSH_INTERVAL,
+        retry_interval: timedelta = UPLOAD_RETRY_INTERVAL,
+    ) -> None:
+        """Initialize the uploader."""
+        self._hass = hass
+        self._api = api
+        self._outbox = outbox
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self._pending: list[DawarichPoint] = []
+        self._backlog = 0
+        self._listeners: list[FlushListener] = []
+        self._duplicate_listeners: list[DuplicateListener] = []
+        self._write_task: asyncio.Task[None] | None = None
+        self._drain_lock = asyncio.Lock()
+        self._stopping = False
+        self._cancel_timer: CALLBACK_TYPE | None = None
+        self._flush_job = HassJob(self._async_flush_later, cancel_on_shutdown=True)
+        self._cancel_write_retry: CALLBACK_TYPE | None = None
+        self._write_retry_job = HassJob(
+            self._async_retry_write, cancel_on_shutdown=True
+        )
+        self._failures = 0
+        self._batches: deque[tuple[int, float]] = deque(maxlen=THROUGHPUT_WINDOW)
+        self.last_flush_latency: float | None = None
+        self.last_success: datetime | None = None
+        self.uploaded = 0
+        self.duplicates = 0
+        self._recent: dict[tuple[str, datetime], None] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of points waiting to be uploaded."""
+        return self._backlog + len(self._pending)
+
+    @property
+    def healthy(self) -> bool:
+        """Return whether the last batch was not scheduled for a retry."""
+        return not self._failures
+
+    @property
+    def throughput(self) -> float | None:
+        """Return the points per second the recent successful batches took."""
+        if not self._batches:
+            return None
+        return sum(count for count, _ in self._batches) / max(
+            sum(latency for _, latency in self._batches), 1e-3
+        )
+
+    async def async_setup(self) -> None:
+        """Open the outbox and start draining any backlog left from last run."""
+        self._backlog = await self._hass.async_add_executor_job(self._outbox.open)
+        if self._backlog:
+            _LOGGER.info(
+                "Resuming upload of %s points to Dawarich from the outbox",
+                self._backlog,
+            )
+            self._async_schedule_flush(timedelta(0))
+
+    async def async_shutdown(self) -> None:
+        """Persist the pending points and close the outbox.
+
+        A running drain stops after its current batch, the rest of the backlog
+        stays in the outbox for the next run.
+        """
+        self._stopping = True
+        if self._cancel_write_retry is not None:
+            self._cancel_write_retry()
+            self._cancel_write_retry = None
+        if self._write_task is not None:
+            await self._write_task
+        if self._pending:
+            _LOGGER.warning(
+                "Dropping %s points that could not be written to the outbox",
+                len(self._pending),
+            )
+        async with self._drain_lock:
+            self._async_cancel_timer()
+            await self._hass.async_add_executor_job(self._outbox.close)
+
+    @callback
+    def async_add_listener(self, listener: FlushListener) -> CALLBACK_TYPE:
+        """Register a listener called with the points and response of each flush."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_add_duplicate_listener(
+        self, listener: DuplicateListener
+    ) -> CALLBACK_TYPE:
+        """Register a listener called with the queued points the outbox held."""
+        self._duplicate_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._duplicate_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_enqueue(self, point: DawarichPoint) -> bool:
+        """Queue a point for writing to the outbox and uploading.
+
+        Return whether the point was queued, and not dropped as a recent fix.
+        """
+        if (key := (point.device_id, point.timestamp)) in self._recent:
+            self.duplicates += 1
+            return False
+        self._recent[key] = None
+        if len(self._recent) > DEDUPE_WINDOW:
+            del self._recent[next(iter(self._recent))]
+        self._pending.append(point)
+        if self._write_task is None:
+            self._write_task = self._hass.async_create_background_task(
+                self._async_write_pending(), "dawarich outbox write"
+            )
+        return True
+
+    async def async_write(self) -> bool:
+        """Wait until the queued points are written to the outbox.
+
+        Return whether all were written; points whose write failed are kept and
+        written again later.
+        """
+        while self._write_task is not None:
+            await asyncio.shield(self._write_task)
+        return not self._pending
+
+    async def async_flush(self) -> None:
+        """Upload the outbox backlog, one bounded batch at a time."""
+        async with self._drain_lock:
+            self._async_cancel_timer()
+            while self._backlog and not self._stopping:
+                rows = await self._hass.async_add_executor_job(
+                    self._outbox.peek, self.batch_size
+                )
+                if not rows:
+                    self._backlog = 0
+                    break
+                if not await self._async_upload(rows):
+                    self._failures += 1
+                    self._async_schedule_flush(self._backoff)
+                    return
+                self._failures = 0
+
+    @property
+    def _backoff(self) -> timedelta:
+        """Return the backoff before the next retry of a failed batch."""
+        return min(
+            self.retry_interval * 2 ** min(self._failures - 1, 16),
+            UPLOAD_RETRY_MAX_INTERVAL,
+        )
+
+    async def _async_write_pending(self) -> None:
+        """Append pending points to the outbox, one group commit at a time."""
+        try:
+            while self._pending:
+                points, self._pending = self._pending, []
+                try:
+                    held = await self._hass.async_add_executor_job(
+                        self._outbox.append, points
+                    )
+                except (sqlite3.Error, OSError) as err:
+                    # Keep the points in memory and try to write them again.
+                    self._pending[:0] = points
+                    _LOGGER.error(
+                        "Error writing %s points to the Dawarich outbox, "
+                        "retrying in %s: %s",
+                        len(points),
+                        self.retry_interval,
+                        err,
+                    )
+                    self._async_schedule_write_retry()
+                    break
+                self.duplicates += len(held)
+                self._backlog += len(points) - len(held)
+                if held:
+                    for listener in list(self._duplicate_listeners):
+                        listener(held)
+        finally:
+            self._write_task = None
+
+        if self._failures:
+            # A retry is already scheduled.
+            return
+        if self._backlog >= self.batch_size:
+            self._async_schedule_flush(timedelta(0))
+        elif self._cancel_timer is None:
+            self._async_schedule_flush(self.flush_interval)
+
+    @callback
+    def _async_schedule_write_retry(self) -> None:
+        if self._cancel_write_retry is None:
+            self._cancel_write_retry = async_call_later(
+                self._hass, self.retry_interval, self._write_retry_job
+            )
+
+    @callback
+    def _async_retry_write(self, _now: datetime) -> None:
+        self._cancel_write_retry = None
+        if self._pending and self._write_task is None:
+            self._write_task = self._hass.async_create_background_task(
+                self._async_write_pending(), "dawarich outbox write"
+            )
+
+    async def _async_upload(self, rows: list[tuple[int, DawarichPoint]]) -> bool:
+        """Upload one batch and return whether it left the outbox."""
+        batch = sorted((point for _, point in rows), key=attrgetter("timestamp"))
+        start = time.monotonic()
+        response = await self._api.add_points(batch)
+        self.last_flush_latency = time.monotonic() - start
+
+        if response.success:
+            _LOGGER.debug(
+                "Uploaded %s points to Dawarich in %.3f s",
+                len(batch),
+                self.last_flush_latency,
+            )
+            self.uploaded += len(batch)
+            self.last_success = dt_util.utcnow()
+            self._batches.append((len(batch), self.last_flush_latency))
+        else:
+            _LOGGER.error(
+                "Error sending %s locations to Dawarich API response code %s and error: %s",
+                len(batch),
+                response.response_code,
+                response.error,
+            )
+
+        for listener in list(self._listeners):
+            listener(batch, response)
+
+        if is_retryable(response):
+            return False
+
+        if not response.success:
+            _LOGGER.warning("Dropping %s locations rejected by Dawarich", len(batch))
+        last_id = rows[-1][0]
+        await self._hass.async_add_executor_job(self._outbox.ack, last_id)
+        self._backlog = max(self._backlog - len(rows), 0)
+        return True
+
+    @callback
+    def _async_schedule_flush(self, delay: timedelta) -> None:
+        self._async_cancel_timer()
+        self._cancel_timer = async_call_later(self._hass, delay, self._flush_job)
+
+    async def _async_flush_later(self, _now: datetime) -> None:
+        self._cancel_timer = None
+        await self.async_flush()
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
@@ -0,0 +1,138 @@
+"""Spatial index of the zones points are tagged with."""
+
+import math
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from homeassistant.core import State
+
+from .helpers import haversine
+
+# Size in degrees of the grid cells zones are indexed in, about 1 km.
+ZONE_CELL_SIZE = 0.01
+METRES_PER_DEGREE = 111_320
+
+
+@dataclass(frozen=True, slots=True)
+class DawarichZone:
+    """The geometry of an active zone."""
+
+    entity_id: str
+    name: str
+    latitude: float
+    longitude: float
+    radius: float
+
+    @classmethod
+    def from_state(cls, state: State) -> "DawarichZone | None":
+        """Return the zone of a zone state, unless it is passive."""
+        attributes = state.attributes
+        if attributes.get("passive") or None in (
+            attributes.get("latitude"),
+            attributes.get("longitude"),
+        ):
+            return None
+        return cls(
+            entity_id=state.entity_id,
+            name=attributes.get("friendly_name", state.object_id),
+            latitude=attributes["latitude"],
+            longitude=attributes["longitude"],
+            radius=attributes.get("radius", 0),
+        )
+
+
+@dataclass(slots=True)
+class DawarichZoneVisit:
+    """The zone a device is in, and since when."""
+
+    zone: DawarichZone | None = None
+    since: datetime | None = None
+    last_fix: datetime | None = None
+
+    @property
+    def duration(self) -> timedelta | None:
+        """Return how long the device has been in its zone."""
+        if self.zone is None or self.since is None or self.last_fix is None:
+            return None
+        return self.last_fix - self.since
+
+
+def _cells(
+    latitude: float, longitude: float, radius: float
+) -> Iterator[tuple[int, int]]:
+    """Return the grid cells a circle overlaps."""
+    lat_span = radius / METRES_PER_DEGREE
+    lon_span = radius / (
+        METRES_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    )
+    for row in range(
+        math.floor((latitude - lat_span) / ZONE_CELL_SIZE),
+        math.floor((latitude + lat_span) / ZONE_CELL_SIZE) + 1,
+    ):
+        for column in range(
+            math.floor((longitude - lon_span) / ZONE_CELL_SIZE),
+            math.floor((longitude + lon_span) / ZONE_CELL_SIZE) + 1,
+        ):
+            yield row, column
+
+
+class DawarichZoneIndex:
+    """Grid index of the active zones.
+
+    Every zone is listed in the cells its circle overlaps, so a lookup only
+    measures the distance to the few zones near a fix. Zones are added, moved
+    and removed one at a time as their states change.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._zones: dict[str, DawarichZone] = {}
+        self._grid: defaultdict[tuple[int, int], set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        """Return the number of indexed zones."""
+        return len(self._zones)
+
+    def update(self, entity_id: str, state: State | None) -> None:
+        """Index the current geometry of a zone, or drop it once removed."""
+        zone = None if state is None else DawarichZone.from_state(state)
+        if (old := self._zones.get(entity_id)) == zone:
+            return
+        if old is not None:
+            for cell in _cells(old.latitude, old.longitude, old.radius):
+                self._grid[cell].discard(entity_id)
+                if not self._grid[cell]:
+                    del self._grid[cell]
+            del self._zones[entity_id]
+        if zone is not None:
+            self._zones[entity_id] = zone
+            for cell in _cells(zone.latitude, zone.longitude, zone.radius):
+                self._grid[cell].add(entity_id)
+
+    def query(
+        self, latitude: float, longitude: float, accuracy: float = 0
+    ) -> DawarichZone | None:
+        """Return the zone a fix is in, like Home Assistant picks it.
+
+        The closest zone wins, and of equally close zones the smallest one.
+        """
+        closest = None
+        closest_distance = math.inf
+        candidates = set()
+        for cell in _cells(latitude, longitude, accuracy):
+            candidates.update(self._grid.get(cell, ()))
+        for entity_id in candidates:
+            zone = self._zones[entity_id]
+            distance = haversine(latitude, longitude, zone.latitude, zone.longitude)
+            if distance - accuracy >= zone.radius:
+                continue
+            if distance < closest_distance or (
+                distance == closest_distance
+                and closest is not None
+                and zone.radius < closest.radius
+            ):
+                closest = zone
+                closest_distance = distance
+        return closest